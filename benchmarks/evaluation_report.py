@@ -0,0 +1,80 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import (
+    accuracy_score,
+    average_precision_score,
+    confusion_matrix,
+    f1_score,
+    roc_auc_score,
+)
+
+from projeto.config import RANDOM_SEED
+from projeto.dataset import load_cached_datasets
+from projeto.evaluation import _positive_scores, evaluation_report
+from projeto.serving import load_model
+from projeto.train import POSITIVE_CLASS
+
+
+def _sklearn_report(
+    y_true: np.ndarray, scores: dict, thresholds: dict, n_bootstraps: int
+) -> None:
+    # The notebook's approach: separate sklearn calls per model and resample.
+    rng = np.random.default_rng(RANDOM_SEED)
+    for name, model_scores in scores.items():
+        y_pred = model_scores >= thresholds[name]
+        confusion_matrix(y_true, y_pred)
+        accuracy_score(y_true, y_pred)
+        f1_score(y_true, y_pred)
+        roc_auc_score(y_true, model_scores)
+        average_precision_score(y_true, model_scores)
+        for _ in range(n_bootstraps):
+            rows = rng.integers(len(y_true), size=len(y_true))
+            accuracy_score(y_true[rows], y_pred[rows])
+            f1_score(y_true[rows], y_pred[rows])
+            roc_auc_score(y_true[rows], model_scores[rows])
+            average_precision_score(y_true[rows], model_scores[rows])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compare the vectorized evaluation report with sklearn calls.'
+    )
+    parser.add_argument('model_paths', type=Path, nargs='+')
+    parser.add_argument('--base-path', type=Path, default=Path.cwd())
+    parser.add_argument('--bootstraps', type=int, default=200)
+    args = parser.parse_args()
+
+    datasets = load_cached_datasets(args.base_path)
+    y_true = (datasets.y_test == POSITIVE_CLASS).to_numpy()
+    scores, thresholds = {}, {}
+    for model_path in args.model_paths:
+        scores[str(model_path)], thresholds[str(model_path)] = _positive_scores(
+            load_model(model_path), datasets.X_test
+        )
+
+    timings = {}
+    start = time.perf_counter()
+    evaluation_report(
+        y_true,
+        scores,
+        threshold=thresholds,
+        positive_label=True,
+        n_bootstraps=args.bootstraps,
+    )
+    timings['vectorized'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _sklearn_report(y_true, scores, thresholds, args.bootstraps)
+    timings['sklearn'] = time.perf_counter() - start
+
+    print(f'{len(scores)} models, {args.bootstraps} resamples')
+    print(f'{"report":<12}{"time (s)":>10}')
+    for name, seconds in timings.items():
+        print(f'{name:<12}{seconds:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
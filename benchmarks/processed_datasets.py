@@ -0,0 +1,104 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from projeto.config import FILE_FORMATS, RANDOM_SEED, TEST_SIZE
+from projeto.dataset import (
+    cut_non_americans,
+    load_processed_datasets,
+    read_dataset,
+    save_processed_datasets,
+)
+
+
+def _rss_mb() -> float:
+    # The second field of /proc/self/statm is the resident set size in pages.
+    with open('/proc/self/statm') as statm:
+        resident_pages = int(statm.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def _build_datasets(base_path: Path, work_path: Path, replicas: int) -> None:
+    df = cut_non_americans(read_dataset(base_path))
+    df = pd.concat([df] * replicas, ignore_index=True)
+
+    X = df.drop(columns=['income'])
+    y = df['income']
+    X_train, X_test, y_train, y_test = train_test_split(
+        X,
+        y,
+        test_size=TEST_SIZE,
+        random_state=RANDOM_SEED,
+    )
+    for file_format in FILE_FORMATS:
+        save_processed_datasets(
+            X=X,
+            y=y,
+            X_train=X_train,
+            X_test=X_test,
+            y_train=y_train,
+            y_test=y_test,
+            base_path=work_path,
+            file_format=file_format,
+        )
+
+
+def _measure_load(
+    work_path: Path, file_format: str, columns: list[str] | None, queue
+) -> None:
+    # Import the readers up front so their cost is not counted as load RSS.
+    import pyarrow.feather
+    import pyarrow.parquet  # noqa: F401
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    datasets = load_processed_datasets(
+        work_path, file_format=file_format, columns=columns
+    )
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, _rss_mb() - rss_before))
+    del datasets
+
+
+def _run_in_fresh_process(
+    work_path: Path, file_format: str, columns: list[str] | None
+) -> tuple[float, float]:
+    # Each load runs in its own process so allocations are not shared between runs.
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(
+        target=_measure_load, args=(work_path, file_format, columns, queue)
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compare load time and RSS of the processed dataset formats.'
+    )
+    parser.add_argument('--base-path', type=Path, default=Path.cwd())
+    parser.add_argument('--replicas', type=int, default=10)
+    parser.add_argument('--columns', nargs='*', default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_path = Path(work_dir)
+        _build_datasets(args.base_path, work_path, args.replicas)
+
+        print(f'{"format":<10}{"load (s)":>12}{"RSS delta (MB)":>18}')
+        for file_format in FILE_FORMATS:
+            elapsed, rss = _run_in_fresh_process(work_path, file_format, args.columns)
+            print(f'{file_format:<10}{elapsed:>12.3f}{rss:>18.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import pickle
+import time
+from pathlib import Path
+
+from sklearn.base import BaseEstimator
+from sklearn.metrics import f1_score
+
+from projeto.dataset import load_cached_datasets
+from projeto.train import MODEL_SPECS, POSITIVE_CLASS, _training_rows
+
+
+def _measure(estimator: BaseEstimator, X_train, y_train, X_test, y_test) -> tuple:
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = estimator.predict(X_test)
+    predict_time = time.perf_counter() - start
+
+    model_kb = len(pickle.dumps(estimator)) / 1024
+    return len(X_train), fit_time, predict_time, f1_score(y_test, y_pred), model_kb
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compare the subset SVC with the Nystroem + linear SVM model.'
+    )
+    parser.add_argument('--base-path', type=Path, default=Path.cwd())
+    parser.add_argument('--C', type=float, default=1.0)
+    parser.add_argument('--degree', type=int, default=3)
+    parser.add_argument('--n-components', type=int, default=300)
+    args = parser.parse_args()
+
+    datasets = load_cached_datasets(args.base_path)
+    y_train = (datasets.y_train == POSITIVE_CLASS).astype(int)
+    y_test = (datasets.y_test == POSITIVE_CLASS).astype(int)
+
+    svm_spec = MODEL_SPECS['svm']
+    X_subset, y_subset = _training_rows(
+        datasets.X_train, y_train, svm_spec.n_train_rows
+    )
+    svm = svm_spec.build_estimator(None).set_params(
+        sup_ver_mach__C=args.C,
+        sup_ver_mach__kernel='poly',
+        sup_ver_mach__degree=args.degree,
+    )
+    svm_approx = (
+        MODEL_SPECS['svm_approx']
+        .build_estimator(None)
+        .set_params(
+            linear_svm__C=args.C,
+            kernel__degree=args.degree,
+            kernel__n_components=args.n_components,
+        )
+    )
+
+    results = {
+        'svm': _measure(svm, X_subset, y_subset, datasets.X_test, y_test),
+        'svm_approx': _measure(
+            svm_approx, datasets.X_train, y_train, datasets.X_test, y_test
+        ),
+    }
+
+    print(
+        f'{"model":<12}{"train rows":>12}{"fit (s)":>10}{"predict (s)":>14}'
+        f'{"test f1":>10}{"model (KB)":>13}'
+    )
+    for name, (n_rows, fit_time, predict_time, f1, model_kb) in results.items():
+        print(
+            f'{name:<12}{n_rows:>12}{fit_time:>10.2f}{predict_time:>14.3f}'
+            f'{f1:>10.4f}{model_kb:>13.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,21 @@
+from pathlib import Path
+
 DATA_FOLDER = 'data'
 
 ORIGINAL_DATASET_FOLDER = 'original'
 FILE_NAME_ORIG = 'adult.csv'
 
+SCHEMA_PATH = Path(__file__).with_name('schema.json')
+
 PROCESSED_DATASET_FOLDER = 'processed'
+FILE_FORMATS = ('parquet', 'feather', 'csv')
+SPLITS_FOLDER = 'splits'
+DEFAULT_SPLIT_NAME = 'train_test'
+CACHE_FOLDER = 'cache'
+CACHE_MAX_BYTES = 1024**3
+FEATURE_CACHE_FOLDER = 'features'
+SEARCH_FOLDER = 'searches'
+TRAINING_FOLDER = 'training'
 
 RANDOM_SEED = 42
 TEST_SIZE = 0.2
@@ -1,177 +1,77 @@
+import hashlib
+import inspect
+import json
+import shutil
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import cache, cached_property
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+from sklearn.model_selection import train_test_split
 
 from .config import (
+    CACHE_FOLDER,
+    CACHE_MAX_BYTES,
     DATA_FOLDER,
+    DEFAULT_SPLIT_NAME,
+    FILE_FORMATS,
     FILE_NAME_ORIG,
     ORIGINAL_DATASET_FOLDER,
     PROCESSED_DATASET_FOLDER,
+    RANDOM_SEED,
+    SCHEMA_PATH,
+    SPLITS_FOLDER,
+    TEST_SIZE,
 )
 
 
-def _fix_age_datatype(age_series: pd.Series) -> pd.Series:
-    return age_series.astype(int)
-
-
-def _fix_workclass_datatype(workclass_series: pd.Series) -> pd.Series:
-    categories = [
-        'Never-worked',
-        'Without-pay',
-        'Self-emp-inc',
-        'Self-emp-not-inc',
-        'Private',
-        'Local-gov',
-        'State-gov',
-        'Federal-gov',
-    ]
-    cat_type = pd.CategoricalDtype(categories=categories, ordered=False)
-    return workclass_series.astype(cat_type)
-
-
-def _fix_education_datatype(education_series: pd.Series) -> pd.Series:
-    categories = [
-        'Preschool',
-        '1st-4th',
-        '5th-6th',
-        '7th-8th',
-        '9th',
-        '10th',
-        '11th',
-        '12th',
-        'HS-grad',
-        'Assoc-acdm',
-        'Assoc-voc',
-        'Some-college',
-        'Bachelors',
-        'Prof-school',
-        'Masters',
-        'Doctorate',
-    ]
-    cat_type = pd.CategoricalDtype(categories=categories, ordered=True)
-    return education_series.astype(cat_type)
-
-
-def _fix_education_num_datatype(education_num_series: pd.Series) -> pd.Series:
-    return education_num_series.astype(int)
-
-
-def _fix_marital_status_datatype(marital_status_series: pd.Series) -> pd.Series:
-    categories = [
-        'Never-married',
-        'Married-civ-spouse',
-        'Married-AF-spouse',
-        'Married-spouse-absent',
-        'Separated',
-        'Divorced',
-        'Widowed',
-    ]
-    cat_type = pd.CategoricalDtype(categories=categories, ordered=False)
-    return marital_status_series.astype(cat_type)
-
-
-def _fix_occupation_datatype(occupation_series: pd.Series) -> pd.Series:
-    categories = [
-        'Armed-Forces',
-        'Priv-house-serv',
-        'Protective-serv',
-        'Tech-support',
-        'Farming-fishing',
-        'Handlers-cleaners',
-        'Transport-moving',
-        'Machine-op-inspct',
-        'Other-service',
-        'Sales',
-        'Adm-clerical',
-        'Exec-managerial',
-        'Craft-repair',
-        'Prof-specialty',
-    ]
-    cat_type = pd.CategoricalDtype(categories=categories, ordered=False)
-    return occupation_series.astype(cat_type)
-
-
-def _fix_relationship_datatype(relationship_series: pd.Series) -> pd.Series:
-    categories = [
-        'Not-in-family',
-        'Unmarried',
-        'Other-relative',
-        'Own-child',
-        'Husband',
-        'Wife',
-    ]
-    cat_type = pd.CategoricalDtype(categories=categories, ordered=False)
-    return relationship_series.astype(cat_type)
-
-
-def _fix_race_datatype(race_series: pd.Series) -> pd.Series:
-    categories = [
-        'Other',
-        'Amer-Indian-Eskimo',
-        'Asian-Pac-Islander',
-        'Black',
-        'White',
-    ]
-    cat_type = pd.CategoricalDtype(categories=categories, ordered=False)
-    return race_series.astype(cat_type)
-
-
-def _fix_sex_datatype(sex_series: pd.Series) -> pd.Series:
-    categories = [
-        'Female',
-        'Male',
-    ]
-    cat_type = pd.CategoricalDtype(categories=categories, ordered=False)
-    return sex_series.astype(cat_type)
-
-
-def _fix_capital_gain_datatype(capital_gain_series: pd.Series) -> pd.Series:
-    return capital_gain_series.astype(float)
-
-
-def _fix_capital_loss_datatype(capital_loss_series: pd.Series) -> pd.Series:
-    return capital_loss_series.astype(float)
-
-
-def _fix_hours_per_week_datatype(hours_per_week_series: pd.Series) -> pd.Series:
-    return hours_per_week_series.astype(int)
-
-
-def _fix_native_country_datatype(native_country_series: pd.Series) -> pd.Series:
-    categories = native_country_series.value_counts().sort_values().index.tolist()
-    cat_type = pd.CategoricalDtype(categories=categories, ordered=False)
-    return native_country_series.astype(cat_type)
+def _schema_dtype(column_schema: dict) -> pd.CategoricalDtype | np.dtype:
+    if column_schema['dtype'] == 'category':
+        return pd.CategoricalDtype(
+            categories=column_schema['categories'],
+            ordered=column_schema['ordered'],
+        )
+    return np.dtype(column_schema['dtype'])
+
+
+@cache
+def load_schema(schema_path: Path = SCHEMA_PATH) -> dict:
+    # Categories are frozen in the schema file instead of being derived from
+    # each file read, so category codes are the same across loads.
+    with open(schema_path) as schema_file:
+        schema = json.load(schema_file)
+    return {
+        column: _schema_dtype(column_schema) for column, column_schema in schema.items()
+    }
+
+
+def freeze_schema(dataframe: pd.DataFrame, schema_path: Path = SCHEMA_PATH) -> None:
+    schema = {}
+    for column, dtype in dataframe.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            schema[column] = {
+                'dtype': 'category',
+                'categories': dtype.categories.tolist(),
+                'ordered': bool(dtype.ordered),
+            }
+        else:
+            schema[column] = {'dtype': str(dtype)}
+
+    with open(schema_path, 'w') as schema_file:
+        json.dump(schema, schema_file, indent=4)
+        schema_file.write('\n')
+    load_schema.cache_clear()
 
 
 def fix_income_datatype(income_series: pd.Series) -> pd.Series:
-    categories = [
-        '<=50K',
-        '>50K',
-    ]
-    cat_type = pd.CategoricalDtype(categories=categories, ordered=True)
-    return income_series.astype(cat_type)
+    return income_series.astype(load_schema()['income'])
 
 
 def _fix_datatypes(dataframe: pd.DataFrame) -> pd.DataFrame:
-    column_to_fixer = {
-        'age': _fix_age_datatype,
-        'workclass': _fix_workclass_datatype,
-        'education': _fix_education_datatype,
-        'education.num': _fix_education_num_datatype,
-        'marital.status': _fix_marital_status_datatype,
-        'occupation': _fix_occupation_datatype,
-        'relationship': _fix_relationship_datatype,
-        'race': _fix_race_datatype,
-        'sex': _fix_sex_datatype,
-        'capital.gain': _fix_capital_gain_datatype,
-        'capital.loss': _fix_capital_loss_datatype,
-        'hours.per.week': _fix_hours_per_week_datatype,
-        'native.country': _fix_native_country_datatype,
-        'income': fix_income_datatype,
-    }
-    for column, fixer in column_to_fixer.items():
-        dataframe[column] = fixer(dataframe[column])
-    return dataframe
+    return dataframe.astype(load_schema())
 
 
 def _fix_dataframe(dataframe: pd.DataFrame) -> pd.DataFrame:
@@ -179,17 +79,229 @@ def _fix_dataframe(dataframe: pd.DataFrame) -> pd.DataFrame:
     return _fix_datatypes(dataframe)
 
 
-def _read_dataframe(base_path: Path) -> pd.DataFrame:
-    file_orig_path = base_path / DATA_FOLDER / ORIGINAL_DATASET_FOLDER / FILE_NAME_ORIG
-    return pd.read_csv(file_orig_path, na_values='?')
+def _original_file_path(base_path: Path) -> Path:
+    return base_path / DATA_FOLDER / ORIGINAL_DATASET_FOLDER / FILE_NAME_ORIG
 
 
-def read_dataset(file_path: Path) -> pd.DataFrame:
+def _read_dataframe(base_path: Path) -> pd.DataFrame:
+    return pd.read_csv(_original_file_path(base_path), na_values='?')
+
+
+def _downcast_column(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series.dtype):
+        # float32 is only used when every value survives the round trip.
+        downcast = series.astype(np.float32)
+        if np.array_equal(
+            downcast.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True
+        ):
+            return downcast
+    return series
+
+
+def compact_dataframe(dataframe: pd.DataFrame, report: bool = True) -> pd.DataFrame:
+    memory_before = dataframe.memory_usage(deep=True).sum()
+
+    # Columns read back without dtypes (e.g. from CSV) first get their schema
+    # dtype, so categoricals are stored as int8 codes instead of strings.
+    schema = load_schema()
+    dataframe = dataframe.astype(
+        {column: schema[column] for column in dataframe.columns if column in schema}
+    )
+    compacted = pd.DataFrame(
+        {column: _downcast_column(dataframe[column]) for column in dataframe.columns},
+        index=dataframe.index,
+    )
+
+    if report:
+        memory_after = compacted.memory_usage(deep=True).sum()
+        print(
+            f'Memory usage: {memory_before / 2**20:.2f} MB -> '
+            f'{memory_after / 2**20:.2f} MB '
+            f'({memory_before / memory_after:.1f}x smaller)'
+        )
+    return compacted
+
+
+def read_dataset(file_path: Path, compact: bool = False) -> pd.DataFrame:
     df = _read_dataframe(file_path)
     df = _fix_dataframe(df)
+    if compact:
+        df = compact_dataframe(df)
     return df
 
 
+def read_dataset_chunks(
+    base_path: Path, chunksize: int = 100_000
+) -> Iterator[pd.DataFrame]:
+    # The schema dtypes go straight to the parser, so each chunk is built in
+    # its final dtypes.
+    schema = load_schema()
+    yield from pd.read_csv(
+        _original_file_path(base_path),
+        usecols=list(schema),
+        dtype=schema,
+        na_values='?',
+        chunksize=chunksize,
+    )
+
+
+def _save_frame(
+    dataframe: pd.DataFrame, data_folder: Path, name: str, file_format: str
+) -> None:
+    file_path = data_folder / f'{name}.{file_format}'
+    if file_format == 'parquet':
+        dataframe.to_parquet(file_path, index=False)
+    elif file_format == 'feather':
+        # Uncompressed Arrow files can be memory-mapped without decoding.
+        dataframe.reset_index(drop=True).to_feather(
+            file_path, compression='uncompressed'
+        )
+    else:
+        dataframe.to_csv(file_path, index=False)
+
+
+def _load_frame(
+    data_folder: Path,
+    name: str,
+    file_format: str,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    file_path = data_folder / f'{name}.{file_format}'
+    if file_format == 'parquet':
+        return pd.read_parquet(file_path, columns=columns, memory_map=True)
+    if file_format == 'feather':
+        from pyarrow import feather
+
+        table = feather.read_table(file_path, columns=columns, memory_map=True)
+        return table.to_pandas()
+    return pd.read_csv(file_path, usecols=columns)
+
+
+def _check_file_format(file_format: str) -> None:
+    if file_format not in FILE_FORMATS:
+        raise ValueError(
+            f'Unknown file format {file_format!r}, expected one of {FILE_FORMATS}.'
+        )
+
+
+def _processed_folder(base_path: Path) -> Path:
+    return base_path / DATA_FOLDER / PROCESSED_DATASET_FOLDER
+
+
+def _split_positions(X: pd.DataFrame, X_split: pd.DataFrame) -> np.ndarray:
+    positions = X.index.get_indexer(X_split.index)
+    if (positions < 0).any():
+        raise ValueError('Every row of a split must also be a row of X.')
+    return positions
+
+
+def _check_aligned(X_split: pd.DataFrame, y_split: pd.Series) -> None:
+    if not X_split.index.equals(y_split.index):
+        raise ValueError('Features and target of a split must share the same index.')
+
+
+def _save_split_indices(
+    train_index: np.ndarray,
+    test_index: np.ndarray,
+    data_folder: Path,
+    split_name: str,
+) -> None:
+    splits_folder = data_folder / SPLITS_FOLDER
+    splits_folder.mkdir(parents=True, exist_ok=True)
+
+    # Positions index the rows of the saved X, so int32 is enough for any
+    # dataset that fits in a single file.
+    np.savez(
+        splits_folder / f'{split_name}.npz',
+        train=np.asarray(train_index, dtype=np.int32),
+        test=np.asarray(test_index, dtype=np.int32),
+    )
+
+
+def _load_split_indices(
+    data_folder: Path, split_name: str
+) -> tuple[np.ndarray, np.ndarray]:
+    with np.load(data_folder / SPLITS_FOLDER / f'{split_name}.npz') as split:
+        return split['train'], split['test']
+
+
+def save_split_indices(
+    train_index: np.ndarray,
+    test_index: np.ndarray,
+    base_path: Path,
+    split_name: str = DEFAULT_SPLIT_NAME,
+) -> None:
+    _save_split_indices(
+        train_index, test_index, _processed_folder(base_path), split_name
+    )
+
+
+def load_split_indices(
+    base_path: Path, split_name: str = DEFAULT_SPLIT_NAME
+) -> tuple[np.ndarray, np.ndarray]:
+    return _load_split_indices(_processed_folder(base_path), split_name)
+
+
+@dataclass
+class ProcessedDatasets:
+    X: pd.DataFrame
+    y: pd.Series
+    train_index: np.ndarray
+    test_index: np.ndarray
+
+    @cached_property
+    def X_train(self) -> pd.DataFrame:
+        return self.X.iloc[self.train_index]
+
+    @cached_property
+    def X_test(self) -> pd.DataFrame:
+        return self.X.iloc[self.test_index]
+
+    @cached_property
+    def y_train(self) -> pd.Series:
+        return self.y.iloc[self.train_index]
+
+    @cached_property
+    def y_test(self) -> pd.Series:
+        return self.y.iloc[self.test_index]
+
+
+def _save_processed(
+    X: pd.DataFrame,
+    y: pd.Series,
+    train_index: np.ndarray,
+    test_index: np.ndarray,
+    data_folder: Path,
+    file_format: str,
+    split_name: str,
+) -> None:
+    data_folder.mkdir(parents=True, exist_ok=True)
+
+    # The rows are written once; each split only stores positions into X.
+    _save_frame(X, data_folder, 'X', file_format)
+    _save_frame(y.to_frame(), data_folder, 'y', file_format)
+    _save_split_indices(train_index, test_index, data_folder, split_name)
+
+
+def _load_processed(
+    data_folder: Path,
+    file_format: str,
+    columns: list[str] | None,
+    split_name: str,
+    compact: bool = False,
+) -> ProcessedDatasets:
+    X = _load_frame(data_folder, 'X', file_format, columns)
+    y = _load_frame(data_folder, 'y', file_format).squeeze()
+    if compact:
+        X = compact_dataframe(X)
+        y = compact_dataframe(y.to_frame(), report=False).squeeze()
+    train_index, test_index = _load_split_indices(data_folder, split_name)
+
+    return ProcessedDatasets(X, y, train_index, test_index)
+
+
 def save_processed_datasets(
     X: pd.DataFrame,
     y: pd.Series,
@@ -198,26 +310,148 @@ def save_processed_datasets(
     y_train: pd.Series,
     y_test: pd.Series,
     base_path: Path,
+    file_format: str = 'parquet',
+    split_name: str = DEFAULT_SPLIT_NAME,
 ) -> None:
-    data_folder = base_path / DATA_FOLDER / PROCESSED_DATASET_FOLDER
-    data_folder.mkdir(parents=True, exist_ok=True)
-
-    X.to_csv(data_folder / 'X.csv', index=False)
-    y.to_csv(data_folder / 'y.csv', index=False)
-    X_train.to_csv(data_folder / 'X_train.csv', index=False)
-    X_test.to_csv(data_folder / 'X_test.csv', index=False)
-    y_train.to_csv(data_folder / 'y_train.csv', index=False)
-    y_test.to_csv(data_folder / 'y_test.csv', index=False)
-
-
-def load_processed_datasets(base_path: Path):
-    data_folder = base_path / DATA_FOLDER / PROCESSED_DATASET_FOLDER
+    _check_file_format(file_format)
+    _check_aligned(X, y)
+    _check_aligned(X_train, y_train)
+    _check_aligned(X_test, y_test)
+
+    _save_processed(
+        X,
+        y,
+        _split_positions(X, X_train),
+        _split_positions(X, X_test),
+        _processed_folder(base_path),
+        file_format,
+        split_name,
+    )
+
+
+def load_processed_split(
+    base_path: Path,
+    file_format: str = 'parquet',
+    columns: list[str] | None = None,
+    split_name: str = DEFAULT_SPLIT_NAME,
+    compact: bool = False,
+) -> ProcessedDatasets:
+    _check_file_format(file_format)
+    return _load_processed(
+        _processed_folder(base_path), file_format, columns, split_name, compact
+    )
+
+
+def load_processed_datasets(
+    base_path: Path,
+    file_format: str = 'parquet',
+    columns: list[str] | None = None,
+    split_name: str = DEFAULT_SPLIT_NAME,
+    compact: bool = False,
+):
+    datasets = load_processed_split(
+        base_path, file_format, columns, split_name, compact
+    )
+
+    return (
+        datasets.X,
+        datasets.y,
+        datasets.X_train,
+        datasets.X_test,
+        datasets.y_train,
+        datasets.y_test,
+    )
+
+
+def cut_non_americans(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[df['native.country'] == 'United-States']
+    df = df.drop(columns=['native.country'])
+    return df
 
-    X = pd.read_csv(data_folder / 'X.csv')
-    y = pd.read_csv(data_folder / 'y.csv').squeeze()
-    X_train = pd.read_csv(data_folder / 'X_train.csv')
-    X_test = pd.read_csv(data_folder / 'X_test.csv')
-    y_train = pd.read_csv(data_folder / 'y_train.csv').squeeze()
-    y_test = pd.read_csv(data_folder / 'y_test.csv').squeeze()
 
-    return X, y, X_train, X_test, y_train, y_test
+def _hash_file(file_path: Path) -> str:
+    with open(file_path, 'rb') as file:
+        return hashlib.file_digest(file, 'sha256').hexdigest()
+
+
+def _dataset_cache_key(base_path: Path, file_format: str) -> str:
+    # Everything that changes the processed rows or their dtypes goes into the
+    # key, so editing the raw file, the schema or the config yields a new entry.
+    key = hashlib.sha256()
+    key.update(_hash_file(_original_file_path(base_path)).encode())
+    key.update(_hash_file(SCHEMA_PATH).encode())
+    key.update(inspect.getsource(cut_non_americans).encode())
+    key.update(f'{RANDOM_SEED}|{TEST_SIZE}|{file_format}'.encode())
+    return key.hexdigest()[:16]
+
+
+def _folder_size(folder: Path) -> int:
+    return sum(path.stat().st_size for path in folder.rglob('*') if path.is_file())
+
+
+def _evict_cache_entries(cache_folder: Path, max_bytes: int, keep: Path) -> None:
+    # Least recently used entries go first; the entry in use is never evicted.
+    entries = sorted(
+        (
+            entry
+            for entry in cache_folder.iterdir()
+            if entry.is_dir() and not entry.name.startswith('.')
+        ),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    total_bytes = sum(_folder_size(entry) for entry in entries)
+    for entry in entries:
+        if total_bytes <= max_bytes:
+            break
+        if entry == keep:
+            continue
+        total_bytes -= _folder_size(entry)
+        shutil.rmtree(entry, ignore_errors=True)
+
+
+def _build_processed(data_folder: Path, base_path: Path, file_format: str) -> None:
+    df = cut_non_americans(read_dataset(base_path))
+    X = df.drop(columns=['income'])
+    y = df['income']
+    X_train, X_test = train_test_split(
+        X,
+        test_size=TEST_SIZE,
+        random_state=RANDOM_SEED,
+    )
+    _save_processed(
+        X,
+        y,
+        _split_positions(X, X_train),
+        _split_positions(X, X_test),
+        data_folder,
+        file_format,
+        DEFAULT_SPLIT_NAME,
+    )
+
+
+def load_cached_datasets(
+    base_path: Path,
+    file_format: str = 'parquet',
+    columns: list[str] | None = None,
+    max_cache_bytes: int = CACHE_MAX_BYTES,
+    compact: bool = False,
+) -> ProcessedDatasets:
+    _check_file_format(file_format)
+
+    cache_folder = _processed_folder(base_path) / CACHE_FOLDER
+    cache_folder.mkdir(parents=True, exist_ok=True)
+    entry = cache_folder / _dataset_cache_key(base_path, file_format)
+
+    if not entry.exists():
+        # Build in a hidden folder and rename it, so an interrupted build never
+        # leaves a half-written entry behind.
+        build_folder = Path(tempfile.mkdtemp(dir=cache_folder, prefix='.build-'))
+        try:
+            _build_processed(build_folder, base_path, file_format)
+            build_folder.rename(entry)
+        finally:
+            shutil.rmtree(build_folder, ignore_errors=True)
+
+    entry.touch()
+    _evict_cache_entries(cache_folder, max_cache_bytes, keep=entry)
+    return _load_processed(entry, file_format, columns, DEFAULT_SPLIT_NAME, compact)
@@ -1,7 +1,15 @@
-from .eda_univariate import run_univariate_EDA
-from .eda_jointly import run_joint_EDA
+from .eda_univariate import render_univariate_EDA, run_univariate_EDA
+from .eda_jointly import render_joint_EDA, run_joint_EDA
+from ._descriptive_univariate import describe_univariate_chunks
+from ._incremental_jointly import AssociationAccumulator
+from ._incremental_univariate import UnivariateProfiler
 
 all = [
     run_univariate_EDA,
     run_joint_EDA,
+    render_univariate_EDA,
+    render_joint_EDA,
+    describe_univariate_chunks,
+    AssociationAccumulator,
+    UnivariateProfiler,
 ]
@@ -1,6 +1,11 @@
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import pairwise, repeat
+
+import numpy as np
 import pandas as pd
 from IPython.display import Markdown, display
-from scipy.stats import contingency
 
 
 def _compute_correlation(df_numeric: pd.DataFrame) -> pd.DataFrame:
@@ -8,76 +13,222 @@ def _compute_correlation(df_numeric: pd.DataFrame) -> pd.DataFrame:
     return correlation_matrix
 
 
-def _compute_cramer_v(df_categorical: pd.DataFrame) -> pd.DataFrame:
-    association_data = []
+def _encode_categorical(series: pd.Series) -> tuple[np.ndarray, int]:
+    # Missing values are encoded as -1, like pandas categorical codes.
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), len(series.cat.categories)
+    codes, uniques = pd.factorize(series)
+    return codes, len(uniques)
+
+
+def _cramer_v_from_table(contingency_table: np.ndarray) -> float:
+    # Empty rows and columns are dropped, as pd.crosstab does, before applying
+    # the same formula as contingency.association(method='cramer').
+    contingency_table = contingency_table[contingency_table.sum(axis=1) > 0]
+    contingency_table = contingency_table[:, contingency_table.sum(axis=0) > 0]
+
+    n = contingency_table.sum()
+    expected = (
+        np.outer(contingency_table.sum(axis=1), contingency_table.sum(axis=0)) / n
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chi2 = ((contingency_table - expected) ** 2 / expected).sum()
+        return float(np.sqrt(chi2 / n / (min(contingency_table.shape) - 1)))
+
+
+def _contingency_table_from_codes(
+    codes_1: np.ndarray, n_1: int, codes_2: np.ndarray, n_2: int
+) -> np.ndarray:
+    valid = (codes_1 >= 0) & (codes_2 >= 0)
+    combined_codes = codes_1[valid].astype(np.int64) * n_2 + codes_2[valid]
+    contingency_table = np.bincount(combined_codes, minlength=n_1 * n_2)
+    return contingency_table.reshape(n_1, n_2)
+
+
+def _cramer_v_from_codes(
+    codes_1: np.ndarray, n_1: int, codes_2: np.ndarray, n_2: int
+) -> float:
+    return _cramer_v_from_table(
+        _contingency_table_from_codes(codes_1, n_1, codes_2, n_2)
+    )
+
+
+def _resolve_n_jobs(n_jobs: int) -> int:
+    # Same convention as scikit-learn: -1 uses every core, -2 all but one, ...
+    if n_jobs < 0:
+        return max(os.cpu_count() + 1 + n_jobs, 1)
+    return max(n_jobs, 1)
+
+
+def _cramer_v_pairs(
+    encoded_1: list[tuple[np.ndarray, int]],
+    encoded_2: list[tuple[np.ndarray, int]],
+    pairs: list[tuple[int, int]],
+) -> list[float]:
+    return [_cramer_v_from_codes(*encoded_1[i], *encoded_2[j]) for i, j in pairs]
+
+
+def _discretize_numerical(
+    df_numerical: pd.DataFrame, q: int = 4
+) -> tuple[pd.DataFrame, pd.Series]:
+    # Each numerical feature is discretized into quantiles once, and the codes
+    # are shared by every categorical column and by the target.
+    binned_codes = {}
+    n_bins = {}
+    for col in df_numerical.columns:
+        discretized_num = pd.qcut(df_numerical[col], q=q, duplicates='drop')
+        binned_codes[col] = discretized_num.cat.codes
+        n_bins[col] = len(discretized_num.cat.categories)
+    return pd.DataFrame(binned_codes, index=df_numerical.index), pd.Series(n_bins)
+
+
+def _categorical_binned_cramer_v_rows(
+    encoded_categorical: list[tuple[np.ndarray, int]],
+    discretized: tuple[np.ndarray, np.ndarray],
+    rows: list[int],
+) -> list[list[float]]:
+    binned_codes, n_bins = discretized
+    offsets = np.concatenate([[0], np.cumsum(n_bins)])
+
+    association_values = []
+    for i in rows:
+        codes, n_categories = encoded_categorical[i]
+        # All numerical features are laid side by side, so a single bincount
+        # yields the contingency tables of this categorical against each one.
+        valid = (codes[:, None] >= 0) & (binned_codes >= 0)
+        combined_codes = (
+            codes[:, None].astype(np.int64) * offsets[-1] + binned_codes + offsets[:-1]
+        )
+        contingency_tables = np.bincount(
+            combined_codes[valid], minlength=n_categories * offsets[-1]
+        ).reshape(n_categories, offsets[-1])
+        association_values.append(
+            [
+                _cramer_v_from_table(contingency_tables[:, start:stop])
+                for start, stop in pairwise(offsets)
+            ]
+        )
+    return association_values
 
+
+def _run_sharded(
+    task_function: Callable,
+    columns_1: list,
+    columns_2,
+    tasks: list,
+    n_jobs: int,
+) -> np.ndarray:
+    n_workers = min(_resolve_n_jobs(n_jobs), len(tasks))
+    if n_workers <= 1:
+        return np.array(task_function(columns_1, columns_2, tasks), dtype=float)
+
+    # Strided shards keep the work balanced when task costs vary along the grid.
+    shards = [tasks[k::n_workers] for k in range(n_workers)]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        shard_results = [
+            np.array(shard_values, dtype=float)
+            for shard_values in executor.map(
+                task_function, repeat(columns_1), repeat(columns_2), shards
+            )
+        ]
+
+    association_values = np.empty((len(tasks), *shard_results[0].shape[1:]))
+    for k, shard_values in enumerate(shard_results):
+        association_values[k::n_workers] = shard_values
+    return association_values
+
+
+def _compute_cramer_v(df_categorical: pd.DataFrame, n_jobs: int = 1) -> pd.DataFrame:
     cols = df_categorical.columns
-    for col_1 in cols:
-        for col_2 in cols:
-            # Trivial case.
-            if col_1 == col_2:
-                association_data.append((col_1, col_2, 1.0))
-                continue
+    encoded = [_encode_categorical(df_categorical[col]) for col in cols]
 
-            data_1 = df_categorical[col_1]
-            data_2 = df_categorical[col_2]
+    # Cramer V is symmetric, so only the upper triangle is computed.
+    upper_rows, upper_cols = np.triu_indices(len(cols), k=1)
+    pairs = list(zip(upper_rows.tolist(), upper_cols.tolist()))
+    association_values = np.eye(len(cols))
+    association_values[upper_rows, upper_cols] = _run_sharded(
+        _cramer_v_pairs, encoded, encoded, pairs, n_jobs
+    )
+    association_values[upper_cols, upper_rows] = association_values[
+        upper_rows, upper_cols
+    ]
 
-            contingency_table = pd.crosstab(data_1, data_2)
-            cramer_v = contingency.association(contingency_table, method='cramer')
-            association_data.append((col_1, col_2, cramer_v))
+    association_matrix = pd.DataFrame(
+        association_values,
+        index=pd.Index(cols, name='Variable 1'),
+        columns=pd.Index(cols, name='Variable 2'),
+    )
 
-    association_matrix = pd.DataFrame.from_records(
-        association_data,
-        columns=[
-            'Variable 1',
-            'Variable 2',
-            'Cramer V',
-        ],
-    ).pivot(index='Variable 1', columns='Variable 2', values='Cramer V')
+    return association_matrix.sort_index().sort_index(axis=1)
 
-    return association_matrix
+
+def _compute_target_cramer_v(
+    df_categorical: pd.DataFrame, target: pd.Series, n_jobs: int = 1
+) -> pd.Series:
+    cols = df_categorical.columns
+    encoded = [_encode_categorical(df_categorical[col]) for col in cols]
+
+    # Only the target column of the association matrix is computed.
+    pairs = [(i, 0) for i in range(len(cols))]
+    association_values = _run_sharded(
+        _cramer_v_pairs, encoded, [_encode_categorical(target)], pairs, n_jobs
+    )
+
+    return pd.Series(
+        association_values,
+        index=pd.Index(cols, name='Variable 1'),
+        name='target',
+    ).sort_index()
 
 
 def _compute_categorical_numerical_association(
     df_categorical: pd.DataFrame,
     df_numerical: pd.DataFrame,
+    n_jobs: int = 1,
+    q: int = 4,
+    discretized: tuple[pd.DataFrame, pd.Series] | None = None,
 ) -> pd.DataFrame:
-    association_data = []
-
     categorical_cols = df_categorical.columns
     numerical_cols = df_numerical.columns
 
-    for cat_col in categorical_cols:
-        for num_col in numerical_cols:
-            # Discretize the numerical feature into quantiles.
-            discretized_num = pd.qcut(df_numerical[num_col], q=4, duplicates='drop')
-
-            contingency_table = pd.crosstab(df_categorical[cat_col], discretized_num)
-            cramer_v = contingency.association(contingency_table, method='cramer')
-            association_data.append((cat_col, num_col, cramer_v))
-
-    association_matrix = pd.DataFrame.from_records(
-        association_data,
-        columns=[
-            'Categorical Variable',
-            'Numerical Variable',
-            'Cramer V',
-        ],
-    ).pivot(
-        index='Categorical Variable', columns='Numerical Variable', values='Cramer V'
+    if discretized is None:
+        discretized = _discretize_numerical(df_numerical, q)
+    binned_codes, n_bins = discretized
+
+    encoded_categorical = [
+        _encode_categorical(df_categorical[col]) for col in categorical_cols
+    ]
+    association_values = _run_sharded(
+        _categorical_binned_cramer_v_rows,
+        encoded_categorical,
+        (binned_codes[numerical_cols].to_numpy(), n_bins[numerical_cols].to_numpy()),
+        list(range(len(categorical_cols))),
+        n_jobs,
     )
 
-    return association_matrix
+    association_matrix = pd.DataFrame(
+        association_values,
+        index=pd.Index(categorical_cols, name='Categorical Variable'),
+        columns=pd.Index(numerical_cols, name='Numerical Variable'),
+    )
 
+    return association_matrix.sort_index().sort_index(axis=1)
 
-def describe_associations(X_train: pd.DataFrame, y_train: pd.Series) -> None:
+
+def describe_associations(
+    X_train: pd.DataFrame, y_train: pd.Series, n_jobs: int = 1, q: int = 4
+) -> None:
     X_train_categorical = X_train.select_dtypes(include=['category'])
     X_train_numerical = X_train.select_dtypes(include=['number']).astype('float64')
+    X_train_discretizable = X_train_numerical.drop(
+        columns=['capital.gain', 'capital.loss']
+    )
+    discretized = _discretize_numerical(X_train_discretizable, q)
 
     display(Markdown('## Feature Associations'))
 
     display(Markdown('### Categorical Feature Associations (Cramer V)'))
-    display(_compute_cramer_v(X_train_categorical).round(2))
+    display(_compute_cramer_v(X_train_categorical, n_jobs).round(2))
 
     display(Markdown('### Numerical Feature Correlations (Pearson)'))
     display(_compute_correlation(X_train_numerical).round(2))
@@ -86,7 +237,9 @@ def describe_associations(X_train: pd.DataFrame, y_train: pd.Series) -> None:
     display(
         _compute_categorical_numerical_association(
             X_train_categorical,
-            X_train_numerical.drop(columns=['capital.gain', 'capital.loss']),
+            X_train_discretizable,
+            n_jobs,
+            discretized=discretized,
         ).round(2)
     )
 
@@ -95,17 +248,14 @@ def describe_associations(X_train: pd.DataFrame, y_train: pd.Series) -> None:
     y_train_df = pd.DataFrame(y_train).rename(columns={y_train.name: 'target'})
 
     display(Markdown('### Categorical Features to Target (Cramer V)'))
-    display(
-        _compute_cramer_v(pd.concat([X_train_categorical, y_train_df], axis=1))
-        .loc[:, 'target']
-        .drop('target')
-        .round(2)
-    )
+    display(_compute_target_cramer_v(X_train_categorical, y_train, n_jobs).round(2))
 
     display(Markdown('### Numerical Features to Target (Cramer V)'))
     display(
         _compute_categorical_numerical_association(
             y_train_df,
-            X_train_numerical.drop(columns=['capital.gain', 'capital.loss']),
+            X_train_discretizable,
+            n_jobs,
+            discretized=discretized,
         ).round(2)
     )
@@ -1,6 +1,10 @@
+from collections.abc import Iterable
+
 import pandas as pd
 from IPython.display import Markdown, display
 
+from ._incremental_univariate import UnivariateProfiler
+
 
 def _describe_datatypes(dataframe: pd.DataFrame) -> None:
     display(Markdown('### Data Types'))
@@ -40,3 +44,36 @@ def describe_univariate(dataframe: pd.DataFrame) -> None:
     _describe_size(dataframe)
     _describe_head(dataframe)
     _describe_summary_statistics(dataframe)
+
+
+def describe_univariate_chunks(
+    chunks: Iterable[pd.DataFrame], profiler: UnivariateProfiler | None = None
+) -> UnivariateProfiler:
+    if profiler is None:
+        profiler = UnivariateProfiler()
+    for chunk in chunks:
+        profiler.update(chunk)
+
+    display(Markdown('## Descriptive Analysis'))
+
+    display(Markdown('### Data Types'))
+    display(profiler.dtypes)
+
+    display(Markdown('### Missing Values'))
+    missing_values = profiler.missing_values()
+    display(missing_values[missing_values > 0])
+
+    display(Markdown('### Dataframe Size'))
+    display(Markdown(f'Number of rows: {profiler.n_rows}'))
+    display(Markdown(f'Number of columns: {len(profiler.dtypes)}'))
+
+    display(Markdown(f'### First {profiler.head_rows} Rows of the Dataframe'))
+    display(profiler.head)
+
+    display(Markdown('### Statistical Summary'))
+    display(Markdown('#### Continuous Variables'))
+    display(profiler.numerical_summary().round(2).transpose())
+    display(Markdown('#### Categorical Variables'))
+    display(profiler.categorical_summary().transpose())
+
+    return profiler
@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+
+from ._descriptive_jointly import _contingency_table_from_codes, _cramer_v_from_table
+
+
+# Keeps the pairwise contingency counts of the categorical columns (and of the
+# target, when given) and the pairwise means, sums of squares and co-moments of
+# the numerical columns, so new batches only cost their own rows and partial
+# accumulators built on different workers can be merged.
+class AssociationAccumulator:
+    def __init__(self) -> None:
+        self.categorical_cols: list[str] = []
+        self.categories: list[pd.Index] = []
+        self.numerical_cols: list[str] = []
+        self.contingency_tables: dict[tuple[int, int], np.ndarray] = {}
+        # Entry [i, j] only covers rows where both column i and column j are
+        # present, matching the pairwise deletion of DataFrame.corr.
+        self.n_pairs = np.zeros((0, 0))
+        self.means = np.zeros((0, 0))
+        self.m2s = np.zeros((0, 0))
+        self.co_moments = np.zeros((0, 0))
+        self.n_rows = 0
+
+    def _categorical_frame(self, X: pd.DataFrame, y: pd.Series | None) -> pd.DataFrame:
+        X_categorical = X.select_dtypes(include=['category'])
+        if y is None:
+            return X_categorical
+        if not isinstance(y.dtype, pd.CategoricalDtype):
+            y = y.astype('category')
+        return pd.concat([X_categorical, y.rename('target')], axis=1)
+
+    def _initialize(
+        self, X_categorical: pd.DataFrame, X_numerical: pd.DataFrame
+    ) -> None:
+        self.categorical_cols = X_categorical.columns.tolist()
+        self.categories = [
+            X_categorical[col].cat.categories for col in self.categorical_cols
+        ]
+        self.numerical_cols = X_numerical.columns.tolist()
+
+        for i in range(len(self.categorical_cols)):
+            for j in range(i + 1, len(self.categorical_cols)):
+                shape = (len(self.categories[i]), len(self.categories[j]))
+                self.contingency_tables[i, j] = np.zeros(shape, dtype=np.int64)
+
+        n_numerical = len(self.numerical_cols)
+        self.n_pairs = np.zeros((n_numerical, n_numerical))
+        self.means = np.zeros((n_numerical, n_numerical))
+        self.m2s = np.zeros((n_numerical, n_numerical))
+        self.co_moments = np.zeros((n_numerical, n_numerical))
+
+    def _extend_target(self, categories: pd.Index) -> None:
+        # Target classes are not known up front, so the target columns of the
+        # contingency tables grow as new classes show up.
+        target_index = self.categorical_cols.index('target')
+        known = self.categories[target_index]
+        if categories.difference(known).empty:
+            return
+        extended = known.union(categories)
+        columns = extended.get_indexer(known)
+        for i in range(target_index):
+            table = self.contingency_tables[i, target_index]
+            grown = np.zeros((table.shape[0], len(extended)), dtype=table.dtype)
+            grown[:, columns] = table
+            self.contingency_tables[i, target_index] = grown
+        self.categories[target_index] = extended
+
+    def _combine_moments(
+        self,
+        n_pairs: np.ndarray,
+        means: np.ndarray,
+        m2s: np.ndarray,
+        co_moments: np.ndarray,
+    ) -> None:
+        # Chan et al. pairwise update, applied to every pair of columns at once.
+        # Entry [i, j] of means and m2s describes column i over the rows where
+        # j is also present.
+        total = self.n_pairs + n_pairs
+        weight = np.divide(
+            self.n_pairs * n_pairs, total, out=np.zeros_like(total), where=total > 0
+        )
+        delta = means - self.means
+        self.means += delta * np.divide(
+            n_pairs, total, out=np.zeros_like(total), where=total > 0
+        )
+        self.m2s += m2s + delta**2 * weight
+        self.co_moments += co_moments + delta * delta.T * weight
+        self.n_pairs = total
+
+    def _check_compatible(
+        self,
+        categorical_cols: list[str],
+        categories: list[pd.Index],
+        numerical_cols: list[str],
+    ) -> None:
+        if (
+            categorical_cols != self.categorical_cols
+            or numerical_cols != self.numerical_cols
+            or any(
+                not new.equals(old)
+                for col, new, old in zip(categorical_cols, categories, self.categories)
+                if col != 'target'
+            )
+        ):
+            raise ValueError(
+                'Batches must have the same columns and categories as the data '
+                'already accumulated.'
+            )
+
+    def update(
+        self, X: pd.DataFrame, y: pd.Series | None = None
+    ) -> 'AssociationAccumulator':
+        X_categorical = self._categorical_frame(X, y)
+        X_numerical = X.select_dtypes(include=['number']).astype('float64')
+
+        if self.n_rows == 0:
+            self._initialize(X_categorical, X_numerical)
+        if 'target' in X_categorical and 'target' in self.categorical_cols:
+            self._extend_target(X_categorical['target'].cat.categories)
+            X_categorical['target'] = X_categorical['target'].cat.set_categories(
+                self.categories[-1]
+            )
+        self._check_compatible(
+            X_categorical.columns.tolist(),
+            [X_categorical[col].cat.categories for col in X_categorical.columns],
+            X_numerical.columns.tolist(),
+        )
+
+        codes = [
+            X_categorical[col].cat.codes.to_numpy() for col in self.categorical_cols
+        ]
+        for (i, j), contingency_table in self.contingency_tables.items():
+            contingency_table += _contingency_table_from_codes(
+                codes[i], len(self.categories[i]), codes[j], len(self.categories[j])
+            )
+
+        # The batch is centered on its column means first, so the sums below
+        # stay small whatever the offset of the data.
+        values = X_numerical.to_numpy()
+        present = ~np.isnan(values)
+        n_present = present.sum(axis=0)
+        shift = np.divide(
+            np.where(present, values, 0.0).sum(axis=0),
+            n_present,
+            out=np.zeros(values.shape[1]),
+            where=n_present > 0,
+        )
+        centered = np.where(present, values - shift, 0.0)
+        present = present.astype(float)
+        n_pairs = present.T @ present
+        sums = centered.T @ present
+        centered_means = np.divide(
+            sums, n_pairs, out=np.zeros_like(sums), where=n_pairs > 0
+        )
+        self._combine_moments(
+            n_pairs,
+            centered_means + shift[:, np.newaxis],
+            (centered**2).T @ present - sums * centered_means,
+            centered.T @ centered - sums * centered_means.T,
+        )
+
+        self.n_rows += len(X)
+        return self
+
+    def merge(self, other: 'AssociationAccumulator') -> 'AssociationAccumulator':
+        if other.n_rows == 0:
+            return self
+        if self.n_rows == 0:
+            self.categorical_cols = list(other.categorical_cols)
+            self.categories = list(other.categories)
+            self.numerical_cols = list(other.numerical_cols)
+            self.contingency_tables = {
+                pair: table.copy() for pair, table in other.contingency_tables.items()
+            }
+            self.n_pairs = other.n_pairs.copy()
+            self.means = other.means.copy()
+            self.m2s = other.m2s.copy()
+            self.co_moments = other.co_moments.copy()
+            self.n_rows = other.n_rows
+            return self
+
+        self._check_compatible(
+            other.categorical_cols, other.categories, other.numerical_cols
+        )
+        if 'target' in self.categorical_cols:
+            self._extend_target(other.categories[-1])
+        for (i, j), contingency_table in self.contingency_tables.items():
+            columns = self.categories[j].get_indexer(other.categories[j])
+            contingency_table[:, columns] += other.contingency_tables[i, j]
+        self._combine_moments(other.n_pairs, other.means, other.m2s, other.co_moments)
+        self.n_rows += other.n_rows
+        return self
+
+    def _cramer_v_values(self) -> np.ndarray:
+        association_values = np.eye(len(self.categorical_cols))
+        for (i, j), contingency_table in self.contingency_tables.items():
+            cramer_v = _cramer_v_from_table(contingency_table)
+            association_values[i, j] = association_values[j, i] = cramer_v
+        return association_values
+
+    def cramer_v(self) -> pd.DataFrame:
+        feature_cols = [col for col in self.categorical_cols if col != 'target']
+        n_features = len(feature_cols)
+        association_matrix = pd.DataFrame(
+            self._cramer_v_values()[:n_features, :n_features],
+            index=pd.Index(feature_cols, name='Variable 1'),
+            columns=pd.Index(feature_cols, name='Variable 2'),
+        )
+        return association_matrix.sort_index().sort_index(axis=1)
+
+    def target_cramer_v(self) -> pd.Series:
+        if 'target' not in self.categorical_cols:
+            raise ValueError('No target was given to update.')
+        feature_cols = [col for col in self.categorical_cols if col != 'target']
+        target_index = self.categorical_cols.index('target')
+        return pd.Series(
+            self._cramer_v_values()[: len(feature_cols), target_index],
+            index=pd.Index(feature_cols, name='Variable 1'),
+            name='target',
+        ).sort_index()
+
+    def correlation(self) -> pd.DataFrame:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation_values = self.co_moments / np.sqrt(self.m2s * self.m2s.T)
+        diagonal = np.diag_indices_from(correlation_values)
+        correlation_values[diagonal] = np.where(
+            np.isnan(correlation_values[diagonal]), np.nan, 1.0
+        )
+        return pd.DataFrame(
+            np.clip(correlation_values, -1.0, 1.0),
+            index=self.numerical_cols,
+            columns=self.numerical_cols,
+        )
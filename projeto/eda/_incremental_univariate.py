@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+
+
+# Mergeable quantile summary of one numerical column. Values are counted
+# exactly while the column has few distinct values; past that, the counts are
+# moved into a KLL-style sketch of compactor levels, where each item of level h
+# stands for 2**h values.
+class _QuantileSketch:
+    def __init__(self, max_exact_values: int, sketch_size: int, seed: int) -> None:
+        self.max_exact_values = max_exact_values
+        self.sketch_size = sketch_size
+        self.rng = np.random.default_rng(seed)
+        self.exact_counts: pd.Series | None = pd.Series(dtype='int64')
+        self.levels: list[np.ndarray] = []
+
+    def _add_to_level(self, level: int, values: np.ndarray) -> None:
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], values])
+
+    def _switch_to_sketch(self) -> None:
+        # Each count is split into its binary digits, so a value seen c times
+        # lands once in every level h where bit h of c is set.
+        values = self.exact_counts.index.to_numpy(dtype=float)
+        counts = self.exact_counts.to_numpy()
+        for level in range(int(counts.max(initial=0)).bit_length()):
+            self._add_to_level(level, values[(counts >> level) & 1 == 1])
+        self.exact_counts = None
+        self._compact()
+
+    def _compact(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self.sketch_size:
+                items = np.sort(self.levels[level])
+                # An odd item stays behind so the promoted weight is exact.
+                kept = items[-1:] if len(items) % 2 else items[:0]
+                items = items[: len(items) - len(kept)]
+                offset = self.rng.integers(2)
+                self.levels[level] = kept
+                self._add_to_level(level + 1, items[offset::2])
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        if self.exact_counts is not None:
+            chunk_counts = pd.Series(values).value_counts(sort=False)
+            self.exact_counts = self.exact_counts.add(chunk_counts, fill_value=0)
+            self.exact_counts = self.exact_counts.astype('int64')
+            if len(self.exact_counts) > self.max_exact_values:
+                self._switch_to_sketch()
+            return
+        self._add_to_level(0, values)
+        self._compact()
+
+    def merge(self, other: '_QuantileSketch') -> None:
+        if self.exact_counts is not None and other.exact_counts is not None:
+            self.exact_counts = self.exact_counts.add(
+                other.exact_counts, fill_value=0
+            ).astype('int64')
+            if len(self.exact_counts) > self.max_exact_values:
+                self._switch_to_sketch()
+            return
+
+        if self.exact_counts is not None:
+            self._switch_to_sketch()
+        other_levels = other.levels
+        if other.exact_counts is not None:
+            other_copy = _QuantileSketch(
+                other.max_exact_values, other.sketch_size, seed=0
+            )
+            other_copy.exact_counts = other.exact_counts
+            other_copy._switch_to_sketch()
+            other_levels = other_copy.levels
+        for level, values in enumerate(other_levels):
+            self._add_to_level(level, values)
+        self._compact()
+
+    def _weighted_values(self) -> tuple[np.ndarray, np.ndarray]:
+        if self.exact_counts is not None:
+            counts = self.exact_counts.sort_index()
+            return counts.index.to_numpy(dtype=float), counts.to_numpy()
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(items), 2**level) for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantiles(self, qs: list[float]) -> list[float]:
+        values, weights = self._weighted_values()
+        if len(values) == 0:
+            return [np.nan] * len(qs)
+
+        # Linear interpolation between order statistics, as Series.quantile.
+        cumulative_weights = np.cumsum(weights)
+        n = cumulative_weights[-1]
+        results = []
+        for q in qs:
+            position = q * (n - 1)
+            lower_rank, upper_rank = np.floor(position), np.ceil(position)
+            lower = values[np.searchsorted(cumulative_weights, lower_rank, 'right')]
+            upper = values[np.searchsorted(cumulative_weights, upper_rank, 'right')]
+            results.append(lower + (upper - lower) * (position - lower_rank))
+        return results
+
+
+# Chunk-by-chunk replacement for the whole-frame describe_univariate tables.
+# Numerical columns keep counts, Welford mean and M2, min, max and a quantile
+# sketch; categorical columns keep their category counts. Profilers built on
+# separate shards are combined with merge.
+class UnivariateProfiler:
+    def __init__(
+        self,
+        max_exact_values: int = 10_000,
+        sketch_size: int = 2_000,
+        head_rows: int = 5,
+    ) -> None:
+        self.max_exact_values = max_exact_values
+        self.sketch_size = sketch_size
+        self.head_rows = head_rows
+
+        self.n_rows = 0
+        self.dtypes = pd.Series(dtype=object)
+        self.head = pd.DataFrame()
+        self.null_counts = pd.Series(dtype='int64')
+
+        self.counts: dict[str, int] = {}
+        self.means: dict[str, float] = {}
+        self.m2s: dict[str, float] = {}
+        self.minimums: dict[str, float] = {}
+        self.maximums: dict[str, float] = {}
+        self.sketches: dict[str, _QuantileSketch] = {}
+
+        self.category_counts: dict[str, pd.Series] = {}
+
+    def _numerical_columns(self) -> list[str]:
+        return [col for col in self.dtypes.index if col in self.sketches]
+
+    def _combine_moments(
+        self, col: str, count: int, mean: float, m2: float, minimum, maximum
+    ) -> None:
+        # Chan et al. pairwise update of the Welford mean and sum of squares.
+        if count == 0:
+            return
+        previous_count = self.counts.get(col, 0)
+        if previous_count == 0:
+            self.counts[col] = count
+            self.means[col] = mean
+            self.m2s[col] = m2
+            self.minimums[col] = minimum
+            self.maximums[col] = maximum
+            return
+
+        total = previous_count + count
+        delta = mean - self.means[col]
+        self.means[col] += delta * count / total
+        self.m2s[col] += m2 + delta**2 * previous_count * count / total
+        self.counts[col] = total
+        self.minimums[col] = min(self.minimums[col], minimum)
+        self.maximums[col] = max(self.maximums[col], maximum)
+
+    def _extend_head(self, dataframe: pd.DataFrame) -> None:
+        if self.head.empty:
+            self.head = dataframe.head(self.head_rows)
+            return
+        self.head = pd.concat([self.head, dataframe]).head(self.head_rows)
+
+    def _new_sketch(self) -> _QuantileSketch:
+        seed = len(self.sketches)
+        return _QuantileSketch(self.max_exact_values, self.sketch_size, seed)
+
+    def update(self, chunk: pd.DataFrame) -> 'UnivariateProfiler':
+        if self.n_rows == 0:
+            self.dtypes = chunk.dtypes
+        if len(self.head) < self.head_rows:
+            self._extend_head(chunk)
+
+        self.null_counts = self.null_counts.add(
+            chunk.isnull().sum(), fill_value=0
+        ).astype('int64')
+
+        for col in chunk.select_dtypes(include=['number']).columns:
+            values = chunk[col].dropna().to_numpy(dtype=float)
+            if col not in self.sketches:
+                self.sketches[col] = self._new_sketch()
+            if len(values) == 0:
+                continue
+            mean = values.mean()
+            self._combine_moments(
+                col,
+                len(values),
+                mean,
+                ((values - mean) ** 2).sum(),
+                values.min(),
+                values.max(),
+            )
+            self.sketches[col].update(values)
+
+        for col in chunk.select_dtypes(include=['category']).columns:
+            chunk_counts = chunk[col].value_counts(sort=False)
+            previous_counts = self.category_counts.get(col)
+            if previous_counts is not None:
+                chunk_counts = previous_counts.add(chunk_counts, fill_value=0)
+            self.category_counts[col] = chunk_counts.astype('int64')
+
+        self.n_rows += len(chunk)
+        return self
+
+    def merge(self, other: 'UnivariateProfiler') -> 'UnivariateProfiler':
+        if other.n_rows == 0:
+            return self
+        if self.n_rows == 0:
+            self.dtypes = other.dtypes
+        if len(self.head) < self.head_rows:
+            self._extend_head(other.head)
+
+        self.null_counts = self.null_counts.add(other.null_counts, fill_value=0).astype(
+            'int64'
+        )
+
+        for col, sketch in other.sketches.items():
+            if col not in self.sketches:
+                self.sketches[col] = self._new_sketch()
+            if col in other.counts:
+                self._combine_moments(
+                    col,
+                    other.counts[col],
+                    other.means[col],
+                    other.m2s[col],
+                    other.minimums[col],
+                    other.maximums[col],
+                )
+            self.sketches[col].merge(sketch)
+
+        for col, counts in other.category_counts.items():
+            previous_counts = self.category_counts.get(col)
+            if previous_counts is not None:
+                counts = previous_counts.add(counts, fill_value=0).astype('int64')
+            self.category_counts[col] = counts
+
+        self.n_rows += other.n_rows
+        return self
+
+    def missing_values(self) -> pd.Series:
+        return self.null_counts.reindex(self.dtypes.index)
+
+    def numerical_summary(self) -> pd.DataFrame:
+        summary = {}
+        for col in self._numerical_columns():
+            count = self.counts.get(col, 0)
+            std = np.sqrt(self.m2s[col] / (count - 1)) if count > 1 else np.nan
+            quartiles = self.sketches[col].quantiles([0.25, 0.5, 0.75])
+            summary[col] = [
+                float(count),
+                self.means.get(col, np.nan),
+                std,
+                self.minimums.get(col, np.nan),
+                *quartiles,
+                self.maximums.get(col, np.nan),
+            ]
+        return pd.DataFrame(
+            summary,
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+        )
+
+    def categorical_summary(self) -> pd.DataFrame:
+        summary = {}
+        for col in self.dtypes.index:
+            if col not in self.category_counts:
+                continue
+            counts = self.category_counts[col]
+            observed = counts[counts > 0].sort_values(ascending=False, kind='stable')
+            summary[col] = [
+                counts.sum(),
+                len(observed),
+                observed.index[0] if len(observed) else np.nan,
+                observed.iloc[0] if len(observed) else np.nan,
+            ]
+        return pd.DataFrame(summary, index=['count', 'unique', 'top', 'freq'])
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import multiprocessing
+import re
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+from ._descriptive_jointly import _resolve_n_jobs
+
+# Set only inside render workers; None means figures are shown interactively.
+_output_folder: Path | None = None
+_file_format = 'png'
+_saved_paths: list[Path] = []
+
+
+def _figure_file_name(title: str) -> str:
+    return re.sub(r'[^0-9a-zA-Z]+', '_', title).strip('_').lower()
+
+
+def show_figure(title: str) -> None:
+    if _output_folder is None:
+        plt.show()
+        return
+
+    file_path = _output_folder / f'{_figure_file_name(title)}.{_file_format}'
+    plt.savefig(file_path)
+    # pandas plotting may open a second figure, so every figure is released.
+    plt.close('all')
+    _saved_paths.append(file_path)
+
+
+def _init_render_worker(output_folder: Path, file_format: str) -> None:
+    global _output_folder, _file_format
+    plt.switch_backend('Agg')
+    _output_folder = output_folder
+    _file_format = file_format
+
+
+def _render_task(visualizer: Callable, args: tuple) -> list[Path]:
+    _saved_paths.clear()
+    # The Markdown headings have no notebook to go to in a worker.
+    with contextlib.redirect_stdout(io.StringIO()):
+        visualizer(*args)
+    return list(_saved_paths)
+
+
+def render_figures(
+    tasks: list[tuple[Callable, tuple]],
+    output_folder: Path,
+    file_format: str = 'png',
+    n_jobs: int = -1,
+    timeout: float | None = None,
+) -> list[Path]:
+    output_folder.mkdir(parents=True, exist_ok=True)
+    n_workers = max(min(_resolve_n_jobs(n_jobs), len(tasks)), 1)
+
+    # Fresh interpreters keep the workers away from the notebook kernel and
+    # its interactive backend. Leaving the pool terminates the workers, so a
+    # timeout also stops the figures still being drawn.
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(
+        n_workers,
+        initializer=_init_render_worker,
+        initargs=(output_folder, file_format),
+    ) as pool:
+        results = [
+            pool.apply_async(_render_task, (visualizer, args))
+            for visualizer, args in tasks
+        ]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        file_paths = []
+        for result in results:
+            remaining = (
+                None if deadline is None else max(deadline - time.monotonic(), 0)
+            )
+            try:
+                file_paths.extend(result.get(remaining))
+            except multiprocessing.TimeoutError:
+                n_pending = sum(not result.ready() for result in results)
+                raise TimeoutError(
+                    f'{n_pending} of {len(results)} figure tasks did not finish '
+                    f'within {timeout} seconds.'
+                ) from None
+    return file_paths
@@ -1,12 +1,53 @@
+from collections.abc import Callable
+from pathlib import Path
+
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from IPython.display import Markdown, display
+from matplotlib.colors import LogNorm
+
+from ._rendering import render_figures, show_figure
+
+
+def _box_statistics(data: pd.DataFrame) -> list[dict]:
+    # Same statistics as matplotlib's boxplot (whiskers at 1.5 IQR), computed
+    # with grouped aggregations instead of handing every row to the plot.
+    grouped = data.groupby('categorical', observed=True)['numerical']
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    iqr = quartiles[0.75] - quartiles[0.25]
+    lower_fence = (quartiles[0.25] - 1.5 * iqr).reindex(data['categorical'])
+    upper_fence = (quartiles[0.75] + 1.5 * iqr).reindex(data['categorical'])
+
+    numerical = data['numerical'].to_numpy()
+    within_fences = (numerical >= lower_fence.to_numpy()) & (
+        numerical <= upper_fence.to_numpy()
+    )
+    whiskers = (
+        data['numerical']
+        .where(within_fences)
+        .groupby(data['categorical'], observed=True)
+        .agg(['min', 'max'])
+    )
+
+    return [
+        {
+            'label': str(category),
+            'q1': quartiles.loc[category, 0.25],
+            'med': quartiles.loc[category, 0.5],
+            'q3': quartiles.loc[category, 0.75],
+            'whislo': whiskers.loc[category, 'min'],
+            'whishi': whiskers.loc[category, 'max'],
+        }
+        for category in quartiles.index
+    ]
 
 
 def _visualize_categorical_vs_numerical(
     categorical_data: pd.Series,
     numerical_data: pd.Series,
     title: str,
+    aggregate: bool = False,
 ) -> None:
     display(Markdown(f'### {title}'))
 
@@ -18,20 +59,25 @@ def _visualize_categorical_vs_numerical(
     ).dropna()
 
     plt.figure(figsize=(10, 6))
-    data.boxplot(column='numerical', by='categorical', grid=False)
+    if aggregate:
+        plt.gca().bxp(_box_statistics(data), showfliers=False)
+    else:
+        data.boxplot(column='numerical', by='categorical', grid=False)
     plt.title(title)
     plt.suptitle('')
     plt.xlabel('Category')
     plt.ylabel('Numerical Value')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.show()
+    show_figure(title)
 
 
 def _visualize_numerical_vs_numerical(
     x_data: pd.Series,
     y_data: pd.Series,
     title: str,
+    aggregate: bool = False,
+    bins: int = 50,
 ) -> None:
     display(Markdown(f'### {title}'))
 
@@ -43,13 +89,21 @@ def _visualize_numerical_vs_numerical(
     ).dropna()
 
     plt.figure(figsize=(8, 6))
-    plt.scatter(data['x'], data['y'], alpha=0.6)
+    if aggregate:
+        # A fixed grid of counts replaces one marker per row.
+        counts, x_edges, y_edges = np.histogram2d(data['x'], data['y'], bins=bins)
+        plt.pcolormesh(
+            x_edges, y_edges, np.ma.masked_equal(counts.T, 0), norm=LogNorm()
+        )
+        plt.colorbar(label='Count')
+    else:
+        plt.scatter(data['x'], data['y'], alpha=0.6)
     plt.title(title)
     plt.xlabel('X Value')
     plt.ylabel('Y Value')
     plt.grid(True)
     plt.tight_layout()
-    plt.show()
+    show_figure(title)
 
 
 def _visualize_categorical_vs_categorical(
@@ -76,47 +130,67 @@ def _visualize_categorical_vs_categorical(
     plt.xticks(rotation=45, ha='right')
     plt.legend(title='Category 2', bbox_to_anchor=(1.05, 1), loc='upper left')
     plt.tight_layout()
-    plt.show()
+    show_figure(title)
 
 
-def visualize_jointly(
-    X_train: pd.DataFrame, y_train: pd.Series, show_joint_features: bool = False
-) -> None:
+def _target_figure_tasks(
+    X_train: pd.DataFrame, y_train: pd.Series, aggregate: bool = False
+) -> list[tuple[Callable, tuple]]:
     X_train_categorical = X_train.select_dtypes(include=['object', 'category'])
-    categorical_cols = X_train_categorical.columns
-
     X_train_numerical = X_train.select_dtypes(include=['number']).astype('float64')
-    numerical_cols = X_train_numerical.columns
 
-    display(Markdown('## Feature vs. Target Visualizations'))
-
-    for cat_col in categorical_cols:
-        _visualize_categorical_vs_categorical(
-            X_train_categorical[cat_col],
-            y_train,
-            title=f'Relationship between {cat_col} and Target',
+    tasks = []
+    for cat_col in X_train_categorical.columns:
+        tasks.append(
+            (
+                _visualize_categorical_vs_categorical,
+                (
+                    X_train_categorical[cat_col],
+                    y_train,
+                    f'Relationship between {cat_col} and Target',
+                ),
+            )
         )
-    for num_col in numerical_cols:
-        _visualize_categorical_vs_numerical(
-            y_train,
-            X_train_numerical[num_col],
-            title=f'Relationship between {num_col} and Target',
+    for num_col in X_train_numerical.columns:
+        tasks.append(
+            (
+                _visualize_categorical_vs_numerical,
+                (
+                    y_train,
+                    X_train_numerical[num_col],
+                    f'Relationship between {num_col} and Target',
+                    aggregate,
+                ),
+            )
         )
+    return tasks
 
-    if not show_joint_features:
-        return
 
-    display(Markdown('## Feature vs. Feature Visualizations'))
+def _feature_figure_tasks(
+    X_train: pd.DataFrame, aggregate: bool = False
+) -> list[tuple[Callable, tuple]]:
+    X_train_categorical = X_train.select_dtypes(include=['object', 'category'])
+    categorical_cols = X_train_categorical.columns
+
+    X_train_numerical = X_train.select_dtypes(include=['number']).astype('float64')
+    numerical_cols = X_train_numerical.columns
+
+    tasks = []
 
     # Categorical vs. Categorical
     for col_1 in categorical_cols:
         for col_2 in categorical_cols:
             if col_1 >= col_2:
                 continue
-            _visualize_categorical_vs_categorical(
-                X_train_categorical[col_1],
-                X_train_categorical[col_2],
-                title=f'Relationship between {col_1} and {col_2}',
+            tasks.append(
+                (
+                    _visualize_categorical_vs_categorical,
+                    (
+                        X_train_categorical[col_1],
+                        X_train_categorical[col_2],
+                        f'Relationship between {col_1} and {col_2}',
+                    ),
+                )
             )
 
     # Numerical vs. Numerical
@@ -124,17 +198,67 @@ def visualize_jointly(
         for col_2 in numerical_cols:
             if col_1 >= col_2:
                 continue
-            _visualize_numerical_vs_numerical(
-                X_train_numerical[col_1],
-                X_train_numerical[col_2],
-                title=f'Relationship between {col_1} and {col_2}',
+            tasks.append(
+                (
+                    _visualize_numerical_vs_numerical,
+                    (
+                        X_train_numerical[col_1],
+                        X_train_numerical[col_2],
+                        f'Relationship between {col_1} and {col_2}',
+                        aggregate,
+                    ),
+                )
             )
 
     # Categorical vs. Numerical
     for cat_col in categorical_cols:
         for num_col in numerical_cols:
-            _visualize_categorical_vs_numerical(
-                X_train_categorical[cat_col],
-                X_train_numerical[num_col],
-                title=f'Relationship between {cat_col} and {num_col}',
+            tasks.append(
+                (
+                    _visualize_categorical_vs_numerical,
+                    (
+                        X_train_categorical[cat_col],
+                        X_train_numerical[num_col],
+                        f'Relationship between {cat_col} and {num_col}',
+                        aggregate,
+                    ),
+                )
             )
+
+    return tasks
+
+
+def visualize_jointly(
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    show_joint_features: bool = False,
+    aggregate: bool = False,
+) -> None:
+    display(Markdown('## Feature vs. Target Visualizations'))
+
+    for visualizer, args in _target_figure_tasks(X_train, y_train, aggregate):
+        visualizer(*args)
+
+    if not show_joint_features:
+        return
+
+    display(Markdown('## Feature vs. Feature Visualizations'))
+
+    for visualizer, args in _feature_figure_tasks(X_train, aggregate):
+        visualizer(*args)
+
+
+def render_jointly(
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    output_folder: Path,
+    show_joint_features: bool = False,
+    aggregate: bool = False,
+    file_format: str = 'png',
+    n_jobs: int = -1,
+    timeout: float | None = None,
+) -> list[Path]:
+    tasks = _target_figure_tasks(X_train, y_train, aggregate)
+    if show_joint_features:
+        tasks += _feature_figure_tasks(X_train, aggregate)
+    return render_figures(tasks, output_folder, file_format, n_jobs, timeout)
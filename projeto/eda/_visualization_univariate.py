@@ -1,31 +1,75 @@
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from IPython.display import Markdown, display
 
+from ._rendering import render_figures, show_figure
+
+# Histogram bin widths per numerical column; the bins start at zero and stop at
+# the given value, or at the column maximum when there is none.
+_COLUMN_TO_BIN_WIDTHS = {
+    'age': (1,),
+    'education.num': (1,),
+    'capital.gain': (100,),
+    'capital.loss': (100,),
+    'hours.per.week': (1, 5),
+}
+_COLUMN_TO_BIN_STOP = {
+    'age': 100,
+    'hours.per.week': 100,
+}
+
+
+def _compute_univariate_statistics(dataframe: pd.DataFrame) -> dict:
+    # One pass over the data: every histogram and category count the plots
+    # need is computed here, and the plots only draw these aggregates.
+    statistics = {}
+    for column in _COLUMN_TO_VISUALIZER:
+        if column not in _COLUMN_TO_BIN_WIDTHS:
+            statistics[column] = dataframe[column].value_counts()
+            continue
+
+        values = dataframe[column].dropna().to_numpy()
+        stop = _COLUMN_TO_BIN_STOP.get(column, values.max() + 1)
+        statistics[column] = {
+            width: np.histogram(values, bins=np.arange(0, stop, width))
+            for width in _COLUMN_TO_BIN_WIDTHS[column]
+        }
+    return statistics
+
+
+def _plot_histogram(histogram: tuple[np.ndarray, np.ndarray], color: str) -> None:
+    # Weighting each bin start by its count redraws the precomputed histogram
+    # exactly as plt.hist would have drawn it from the raw values.
+    counts, bin_edges = histogram
+    plt.hist(
+        bin_edges[:-1],
+        bins=bin_edges,
+        weights=counts,
+        color=color,
+        edgecolor='black',
+    )
+
 
-def _visualize_age(dataframe: pd.DataFrame) -> None:
+def _visualize_age(histograms: dict[int, tuple[np.ndarray, np.ndarray]]) -> None:
     display(Markdown('### Age Distribution'))
 
     plt.figure(figsize=(8, 6))
-    plt.hist(
-        dataframe['age'].dropna(),
-        bins=np.arange(0, 100, 1).tolist(),
-        color='skyblue',
-        edgecolor='black',
-    )
+    _plot_histogram(histograms[1], color='skyblue')
     plt.title('Age Distribution')
     plt.xlabel('Age')
     plt.ylabel('Frequency')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Age Distribution')
 
 
-def _visualize_education(dataframe: pd.DataFrame) -> None:
+def _visualize_education(value_counts: pd.Series) -> None:
     display(Markdown('### Education Level Distribution'))
 
-    education_counts = dataframe['education'].value_counts().sort_index()
+    education_counts = value_counts.sort_index()
 
     plt.figure(figsize=(8, 6))
     education_counts.plot(kind='bar', color='lightgreen', edgecolor='black')
@@ -35,31 +79,28 @@ def _visualize_education(dataframe: pd.DataFrame) -> None:
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Education Level Distribution')
 
 
-def _visualize_education_num(dataframe: pd.DataFrame) -> None:
+def _visualize_education_num(
+    histograms: dict[int, tuple[np.ndarray, np.ndarray]],
+) -> None:
     display(Markdown('### Education Number Distribution'))
 
     plt.figure(figsize=(8, 6))
-    plt.hist(
-        dataframe['education.num'].dropna(),
-        bins=np.arange(0, dataframe['education.num'].max() + 1, 1).tolist(),
-        color='salmon',
-        edgecolor='black',
-    )
+    _plot_histogram(histograms[1], color='salmon')
     plt.title('Education Number Distribution')
     plt.xlabel('Education Number')
     plt.ylabel('Frequency')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Education Number Distribution')
 
 
-def _visualize_marital_status(dataframe: pd.DataFrame) -> None:
+def _visualize_marital_status(value_counts: pd.Series) -> None:
     display(Markdown('### Marital Status Distribution'))
 
-    marital_status_counts = dataframe['marital.status'].value_counts().sort_index()
+    marital_status_counts = value_counts.sort_index()
 
     plt.figure(figsize=(8, 6))
     marital_status_counts.plot(kind='bar', color='orchid', edgecolor='black')
@@ -69,13 +110,13 @@ def _visualize_marital_status(dataframe: pd.DataFrame) -> None:
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Marital Status Distribution')
 
 
-def _visualize_occupation(dataframe: pd.DataFrame) -> None:
+def _visualize_occupation(value_counts: pd.Series) -> None:
     display(Markdown('### Occupation Distribution'))
 
-    occupation_counts = dataframe['occupation'].value_counts().sort_values()
+    occupation_counts = value_counts.sort_values()
 
     plt.figure(figsize=(8, 6))
     occupation_counts.plot(kind='barh', color='gold', edgecolor='black')
@@ -84,13 +125,13 @@ def _visualize_occupation(dataframe: pd.DataFrame) -> None:
     plt.ylabel('Occupation')
     plt.grid(axis='x', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Occupation Distribution')
 
 
-def _visualize_relationship(dataframe: pd.DataFrame) -> None:
+def _visualize_relationship(value_counts: pd.Series) -> None:
     display(Markdown('### Relationship Distribution'))
 
-    relationship_counts = dataframe['relationship'].value_counts().sort_values()
+    relationship_counts = value_counts.sort_values()
 
     plt.figure(figsize=(8, 6))
     relationship_counts.plot(kind='bar', color='cyan', edgecolor='black')
@@ -100,13 +141,13 @@ def _visualize_relationship(dataframe: pd.DataFrame) -> None:
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Relationship Distribution')
 
 
-def _visualize_race(dataframe: pd.DataFrame) -> None:
+def _visualize_race(value_counts: pd.Series) -> None:
     display(Markdown('### Race Distribution'))
 
-    race_counts = dataframe['race'].value_counts().sort_values()
+    race_counts = value_counts.sort_values()
 
     plt.figure(figsize=(8, 6))
     race_counts.plot(kind='bar', color='lightcoral', edgecolor='black')
@@ -116,7 +157,7 @@ def _visualize_race(dataframe: pd.DataFrame) -> None:
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Race Distribution')
 
     plt.figure(figsize=(8, 6))
     race_counts.plot(kind='bar', color='lightcoral', edgecolor='black')
@@ -127,13 +168,13 @@ def _visualize_race(dataframe: pd.DataFrame) -> None:
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Race Distribution - log scale')
 
 
-def _visualize_sex(dataframe: pd.DataFrame) -> None:
+def _visualize_sex(value_counts: pd.Series) -> None:
     display(Markdown('### Sex Distribution'))
 
-    sex_counts = dataframe['sex'].value_counts().sort_values()
+    sex_counts = value_counts.sort_values()
 
     plt.figure(figsize=(8, 6))
     sex_counts.plot(kind='bar', color='lightblue', edgecolor='black')
@@ -143,111 +184,87 @@ def _visualize_sex(dataframe: pd.DataFrame) -> None:
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Sex Distribution')
 
 
-def _visualize_capital_gain(dataframe: pd.DataFrame) -> None:
+def _visualize_capital_gain(
+    histograms: dict[int, tuple[np.ndarray, np.ndarray]],
+) -> None:
     display(Markdown('### Capital Gain Distribution'))
 
     plt.figure(figsize=(8, 6))
-    plt.hist(
-        dataframe['capital.gain'].dropna(),
-        bins=np.arange(0, dataframe['capital.gain'].max() + 1, 100).tolist(),
-        color='lightyellow',
-        edgecolor='black',
-    )
+    _plot_histogram(histograms[100], color='lightyellow')
     plt.title('Capital Gain Distribution')
     plt.xlabel('Capital Gain')
     plt.ylabel('Frequency')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Capital Gain Distribution')
 
 
-def _visualize_capital_loss(dataframe: pd.DataFrame) -> None:
+def _visualize_capital_loss(
+    histograms: dict[int, tuple[np.ndarray, np.ndarray]],
+) -> None:
     display(Markdown('### Capital Loss Distribution'))
 
     plt.figure(figsize=(8, 6))
-    plt.hist(
-        dataframe['capital.loss'].dropna(),
-        bins=np.arange(0, dataframe['capital.loss'].max() + 1, 100).tolist(),
-        color='lightpink',
-        edgecolor='black',
-    )
+    _plot_histogram(histograms[100], color='lightpink')
     plt.title('Capital Loss Distribution')
     plt.xlabel('Capital Loss')
     plt.ylabel('Frequency')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Capital Loss Distribution')
 
 
-def _visualize_hours_per_week(dataframe: pd.DataFrame) -> None:
+def _visualize_hours_per_week(
+    histograms: dict[int, tuple[np.ndarray, np.ndarray]],
+) -> None:
     display(Markdown('### Hours Per Week Distribution'))
 
     plt.figure(figsize=(8, 6))
-    plt.hist(
-        dataframe['hours.per.week'].dropna(),
-        bins=np.arange(0, 100, 1).tolist(),
-        color='lightgrey',
-        edgecolor='black',
-    )
+    _plot_histogram(histograms[1], color='lightgrey')
     plt.title('Hours Per Week Distribution')
     plt.xlabel('Hours Per Week')
     plt.ylabel('Frequency')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Hours Per Week Distribution')
 
     plt.figure(figsize=(8, 6))
-    plt.hist(
-        dataframe['hours.per.week'].dropna(),
-        bins=np.arange(0, 100, 5).tolist(),
-        color='lightgrey',
-        edgecolor='black',
-    )
+    _plot_histogram(histograms[5], color='lightgrey')
     plt.title('Hours Per Week Distribution - 5 hour bins')
     plt.xlabel('Hours Per Week')
     plt.ylabel('Frequency')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Hours Per Week Distribution - 5 hour bins')
 
     plt.figure(figsize=(8, 6))
-    plt.hist(
-        dataframe['hours.per.week'].dropna(),
-        bins=np.arange(0, 100, 1).tolist(),
-        color='lightgrey',
-        edgecolor='black',
-    )
+    _plot_histogram(histograms[1], color='lightgrey')
     plt.title('Hours Per Week Distribution - log scale')
     plt.xlabel('Hours Per Week')
     plt.ylabel('Frequency')
     plt.yscale('log')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Hours Per Week Distribution - log scale')
 
     plt.figure(figsize=(8, 6))
-    plt.hist(
-        dataframe['hours.per.week'].dropna(),
-        bins=np.arange(0, 100, 5).tolist(),
-        color='lightgrey',
-        edgecolor='black',
-    )
+    _plot_histogram(histograms[5], color='lightgrey')
     plt.title('Hours Per Week Distribution - 5 hour bins - log scale')
     plt.xlabel('Hours Per Week')
     plt.ylabel('Frequency')
     plt.yscale('log')
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Hours Per Week Distribution - 5 hour bins - log scale')
 
 
-def _visualize_native_country(dataframe: pd.DataFrame) -> None:
+def _visualize_native_country(value_counts: pd.Series) -> None:
     display(Markdown('### Native Country Distribution'))
 
-    native_country_counts = dataframe['native.country'].value_counts().sort_values()
+    native_country_counts = value_counts.sort_values()
 
     plt.figure(figsize=(8, 8))
     native_country_counts.plot(kind='barh', color='lightseagreen', edgecolor='black')
@@ -256,13 +273,13 @@ def _visualize_native_country(dataframe: pd.DataFrame) -> None:
     plt.ylabel('Native Country')
     plt.grid(axis='x', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Native Country Distribution')
 
 
-def _visualize_income(dataframe: pd.DataFrame) -> None:
+def _visualize_income(value_counts: pd.Series) -> None:
     display(Markdown('### Income Distribution'))
 
-    income_counts = dataframe['income'].value_counts().sort_index()
+    income_counts = value_counts.sort_index()
 
     plt.figure(figsize=(8, 6))
     income_counts.plot(kind='bar', color='plum', edgecolor='black')
@@ -272,21 +289,45 @@ def _visualize_income(dataframe: pd.DataFrame) -> None:
     plt.xticks(rotation=0)
     plt.grid(axis='y', alpha=0.75)
     plt.tight_layout()
-    plt.show()
+    show_figure('Income Distribution')
+
+
+_COLUMN_TO_VISUALIZER = {
+    'age': _visualize_age,
+    'education': _visualize_education,
+    'education.num': _visualize_education_num,
+    'marital.status': _visualize_marital_status,
+    'occupation': _visualize_occupation,
+    'relationship': _visualize_relationship,
+    'race': _visualize_race,
+    'sex': _visualize_sex,
+    'capital.gain': _visualize_capital_gain,
+    'capital.loss': _visualize_capital_loss,
+    'hours.per.week': _visualize_hours_per_week,
+    'native.country': _visualize_native_country,
+    'income': _visualize_income,
+}
 
 
 def visualize_univariate(dataframe: pd.DataFrame) -> None:
     display(Markdown('## Visualizations'))
-    _visualize_age(dataframe)
-    _visualize_education(dataframe)
-    _visualize_education_num(dataframe)
-    _visualize_marital_status(dataframe)
-    _visualize_occupation(dataframe)
-    _visualize_relationship(dataframe)
-    _visualize_race(dataframe)
-    _visualize_sex(dataframe)
-    _visualize_capital_gain(dataframe)
-    _visualize_capital_loss(dataframe)
-    _visualize_hours_per_week(dataframe)
-    _visualize_native_country(dataframe)
-    _visualize_income(dataframe)
+    statistics = _compute_univariate_statistics(dataframe)
+    for column, visualizer in _COLUMN_TO_VISUALIZER.items():
+        visualizer(statistics[column])
+
+
+def render_univariate(
+    dataframe: pd.DataFrame,
+    output_folder: Path,
+    file_format: str = 'png',
+    n_jobs: int = -1,
+    timeout: float | None = None,
+) -> list[Path]:
+    # The statistics are computed once here, so each task only ships the
+    # aggregates its visualizer draws.
+    statistics = _compute_univariate_statistics(dataframe)
+    tasks = [
+        (visualizer, (statistics[column],))
+        for column, visualizer in _COLUMN_TO_VISUALIZER.items()
+    ]
+    return render_figures(tasks, output_folder, file_format, n_jobs, timeout)
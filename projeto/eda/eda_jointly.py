@@ -1,11 +1,41 @@
+from pathlib import Path
+
 import pandas as pd
 from IPython.display import Markdown, display
 
 from ._descriptive_jointly import describe_associations
-from ._visualization_jointly import visualize_jointly
+from ._visualization_jointly import render_jointly, visualize_jointly
 
 
-def run_joint_EDA(X_train: pd.DataFrame, y_train: pd.Series) -> None:
+def run_joint_EDA(
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    n_jobs: int = 1,
+    q: int = 4,
+    aggregate: bool = False,
+) -> None:
     display(Markdown('# Bivariate EDA\n---\n'))
-    describe_associations(X_train, y_train)
-    visualize_jointly(X_train, y_train)
+    describe_associations(X_train, y_train, n_jobs, q)
+    visualize_jointly(X_train, y_train, aggregate=aggregate)
+
+
+def render_joint_EDA(
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    output_folder: Path,
+    show_joint_features: bool = False,
+    aggregate: bool = False,
+    file_format: str = 'png',
+    n_jobs: int = -1,
+    timeout: float | None = None,
+) -> list[Path]:
+    return render_jointly(
+        X_train,
+        y_train,
+        output_folder,
+        show_joint_features,
+        aggregate,
+        file_format,
+        n_jobs,
+        timeout,
+    )
@@ -1,8 +1,10 @@
+from pathlib import Path
+
 import pandas as pd
 from IPython.display import Markdown, display
 
 from ._descriptive_univariate import describe_univariate
-from ._visualization_univariate import visualize_univariate
+from ._visualization_univariate import render_univariate, visualize_univariate
 
 
 def run_univariate_EDA(dataframe: pd.DataFrame) -> None:
@@ -10,3 +12,13 @@ def run_univariate_EDA(dataframe: pd.DataFrame) -> None:
     describe_univariate(dataframe)
     display(Markdown('---\n'))
     visualize_univariate(dataframe)
+
+
+def render_univariate_EDA(
+    dataframe: pd.DataFrame,
+    output_folder: Path,
+    file_format: str = 'png',
+    n_jobs: int = -1,
+    timeout: float | None = None,
+) -> list[Path]:
+    return render_univariate(dataframe, output_folder, file_format, n_jobs, timeout)
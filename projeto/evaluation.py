@@ -0,0 +1,631 @@
+import argparse
+import time
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+
+from .config import RANDOM_SEED
+from .dataset import load_cached_datasets
+from .parallel import plan_parallelism, thread_limits
+from .serving import load_model
+from .train import POSITIVE_CLASS
+
+BOOTSTRAP_METRICS = ('accuracy', 'f1', 'roc_auc', 'pr_auc')
+# Resamples are scored in blocks of at most MAX_CELLS weights, small enough
+# for the intermediate arrays to stay in cache, and handed to worker processes
+# TASK_RESAMPLES at a time.
+MAX_CELLS = 2**17
+TASK_RESAMPLES = 1000
+
+
+def _score_matrix(scores) -> pd.DataFrame:
+    # One column of scores per model; a single array is one unnamed model.
+    if isinstance(scores, pd.DataFrame):
+        return scores.astype(np.float64)
+    if isinstance(scores, dict):
+        return pd.DataFrame(
+            {
+                name: np.asarray(values, dtype=np.float64)
+                for name, values in scores.items()
+            }
+        )
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.ndim == 1:
+        scores = scores[:, None]
+    return pd.DataFrame(scores, columns=[f'model_{i}' for i in range(scores.shape[1])])
+
+
+def _sorted_pass(scores: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Rows by decreasing score, and the position of the last row of each
+    # distinct score: the cumulative counts there are the confusion matrices
+    # of every threshold at once.
+    order = np.argsort(-scores, kind='mergesort')
+    sorted_scores = scores[order]
+    ends = np.append(
+        np.flatnonzero(sorted_scores[1:] != sorted_scores[:-1]), len(scores) - 1
+    )
+    return order, ends, sorted_scores[ends]
+
+
+def _cumulative_counts(
+    weights: np.ndarray, order: np.ndarray, is_positive: np.ndarray, ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    # weights has one column per resample, or a single column of ones for the
+    # sample itself. Positive and negative rows are summed apart, so every
+    # row goes through a single cumulative sum; the counts at a threshold are
+    # then read at the number of rows of each class above it.
+    sorted_positive = is_positive[order]
+    counts = []
+    for in_class in (sorted_positive, ~sorted_positive):
+        rows = order[in_class]
+        cumulative = np.zeros(
+            (len(rows) + 1, weights.shape[1]),
+            dtype=np.promote_types(weights.dtype, np.int64),
+        )
+        np.cumsum(weights[rows], axis=0, dtype=cumulative.dtype, out=cumulative[1:])
+        counts.append(cumulative[np.cumsum(in_class)[ends]])
+    return counts[0], counts[1]
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # 0/0 is 0, as with zero_division=0 in sklearn.
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.zeros(np.broadcast(numerator, denominator).shape),
+        where=denominator != 0,
+    )
+
+
+def _steps(counts: np.ndarray) -> np.ndarray:
+    steps = np.empty_like(counts)
+    steps[0] = counts[0]
+    np.subtract(counts[1:], counts[:-1], out=steps[1:])
+    return steps
+
+
+def _column_dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.einsum('ij,ij->j', a, b)
+
+
+def _average_precision(
+    tps: np.ndarray, fps: np.ndarray, tp_steps: np.ndarray
+) -> np.ndarray:
+    # Counts are whole numbers, so where tps + fps is 0 both steps are 0 too.
+    precision = np.add(tps, fps, dtype=np.float64)
+    np.maximum(precision, 1, out=precision)
+    np.divide(tps, precision, out=precision)
+    return _column_dot(tp_steps, precision) / tps[-1]
+
+
+def _curve_metrics(tps: np.ndarray, fps: np.ndarray, n_above: int) -> dict:
+    # n_above is the number of distinct scores at or above the threshold. The
+    # areas work on counts and are normalized once, instead of building the
+    # rate curves, and every full-size step reuses its buffers.
+    positives = tps[-1]
+    negatives = fps[-1]
+    tp_steps = _steps(tps)
+    fp_steps = _steps(fps)
+    roc_area = 2 * _column_dot(fp_steps, tps) - _column_dot(fp_steps, tp_steps)
+
+    tp = tps[n_above - 1] if n_above else np.zeros_like(positives)
+    fp = fps[n_above - 1] if n_above else np.zeros_like(negatives)
+    fn = positives - tp
+    tn = negatives - fp
+    return {
+        'tn': tn,
+        'fp': fp,
+        'fn': fn,
+        'tp': tp,
+        'accuracy': (tp + tn) / (tp + tn + fp + fn),
+        'precision': _divide(tp, tp + fp),
+        'recall': _divide(tp, tp + fn),
+        'f1': _divide(2 * tp, 2 * tp + fp + fn),
+        'positive_rate': tp / (tp + tn + fp + fn),
+        'roc_auc': roc_area / (2 * positives * negatives),
+        'pr_auc': _average_precision(tps, fps, tp_steps),
+    }
+
+
+def threshold_curves(y_true, scores, positive_label=1) -> dict[str, pd.DataFrame]:
+    # Confusion matrix, precision, recall and F1 at every distinct score of
+    # every model, highest threshold first.
+    is_positive = np.asarray(y_true) == positive_label
+    curves = {}
+    for name, model_scores in _score_matrix(scores).items():
+        order, ends, thresholds = _sorted_pass(model_scores.to_numpy())
+        tps, fps = _cumulative_counts(
+            np.ones((len(order), 1)), order, is_positive, ends
+        )
+        tps, fps = tps[:, 0], fps[:, 0]
+        fns, tns = tps[-1] - tps, fps[-1] - fps
+        curves[name] = pd.DataFrame(
+            {
+                'threshold': thresholds,
+                'tn': tns,
+                'fp': fps,
+                'fn': fns,
+                'tp': tps,
+                'precision': _divide(tps, tps + fps),
+                'recall': _divide(tps, tps + fns),
+                'f1': _divide(2 * tps, 2 * tps + fps + fns),
+                'fpr': _divide(fps, fps + tns),
+            }
+        )
+    return curves
+
+
+def _blocks(n_items: int, block_size: int) -> list[int]:
+    block_size = max(block_size, 1)
+    return [min(block_size, n_items - start) for start in range(0, n_items, block_size)]
+
+
+def _bootstrap_weights(
+    rng: np.random.Generator, n_rows: int, n_bootstraps: int
+) -> np.ndarray:
+    # How many times each row is drawn in each resample, one column per
+    # resample. A resample then keeps the sorted order of the sample and needs
+    # no sort of its own.
+    draws = rng.integers(n_rows, size=(n_bootstraps, n_rows)) * n_bootstraps
+    draws += np.arange(n_bootstraps)[:, None]
+    return np.bincount(draws.ravel(), minlength=n_rows * n_bootstraps).reshape(
+        n_rows, n_bootstraps
+    )
+
+
+def _pass_metrics(
+    weights: np.ndarray, model_pass: tuple, is_positive: np.ndarray
+) -> dict:
+    order, ends, n_above = model_pass
+    tps, fps = _cumulative_counts(weights, order, is_positive, ends)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return _curve_metrics(tps, fps, n_above)
+
+
+def _model_threshold(threshold: float | dict[str, float], name: str) -> float:
+    return threshold[name] if isinstance(threshold, dict) else threshold
+
+
+def evaluation_report(
+    y_true,
+    scores,
+    threshold: float | dict[str, float] = 0.5,
+    positive_label=1,
+    n_bootstraps: int = 1000,
+    confidence: float = 0.95,
+    random_state: int = RANDOM_SEED,
+) -> pd.DataFrame:
+    # One row per model. Rows with scores at or above threshold, a single
+    # value or one per model name, are predicted positive. Every model is
+    # scored on the same resamples, so their intervals are paired.
+    is_positive = np.asarray(y_true) == positive_label
+    scores = _score_matrix(scores)
+    n_rows = len(scores)
+
+    passes = {}
+    report = {}
+    for name, model_scores in scores.items():
+        order, ends, thresholds = _sorted_pass(model_scores.to_numpy())
+        passes[name] = (order, ends)
+        n_above = np.searchsorted(
+            -thresholds, -_model_threshold(threshold, name), side='right'
+        )
+        tps, fps = _cumulative_counts(
+            np.ones((len(order), 1)), order, is_positive, ends
+        )
+        report[name] = {
+            metric: float(value[0])
+            for metric, value in _curve_metrics(tps, fps, n_above).items()
+        }
+        f1 = _divide(2 * tps[:, 0], tps[:, 0] + fps[:, 0] + tps[-1, 0])
+        report[name]['best_threshold'] = thresholds[f1.argmax()]
+        report[name]['best_f1'] = f1.max()
+        passes[name] += (n_above,)
+
+    rng = np.random.default_rng(random_state)
+    resampled = {name: {metric: [] for metric in BOOTSTRAP_METRICS} for name in scores}
+    for block in _blocks(n_bootstraps, MAX_CELLS // max(n_rows, 1)):
+        weights = _bootstrap_weights(rng, n_rows, block)
+        for name, model_pass in passes.items():
+            metrics = _pass_metrics(weights, model_pass, is_positive)
+            for metric in BOOTSTRAP_METRICS:
+                resampled[name][metric].append(metrics[metric])
+
+    tail = (1 - confidence) / 2 * 100
+    for name in scores if n_bootstraps else ():
+        for metric in BOOTSTRAP_METRICS:
+            values = np.concatenate(resampled[name][metric])
+            low, high = np.nanpercentile(values, [tail, 100 - tail])
+            report[name][f'{metric}_low'] = low
+            report[name][f'{metric}_high'] = high
+    return pd.DataFrame.from_dict(report, orient='index')
+
+
+def _model_pass(scores: np.ndarray, threshold: float) -> tuple:
+    order, ends, thresholds = _sorted_pass(scores)
+    return order, ends, np.searchsorted(-thresholds, -threshold, side='right')
+
+
+def _bootstrap_task(
+    is_positive: np.ndarray,
+    model_passes: list[tuple],
+    n_resamples: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    # Metrics of every model on the same resamples, shaped (models, metrics,
+    # resamples).
+    rng = np.random.default_rng(seed)
+    n_rows = len(is_positive)
+    blocks = []
+    for block in _blocks(n_resamples, MAX_CELLS // n_rows):
+        weights = _bootstrap_weights(rng, n_rows, block)
+        blocks.append(
+            [
+                [metrics[metric] for metric in BOOTSTRAP_METRICS]
+                for metrics in (
+                    _pass_metrics(weights, model_pass, is_positive)
+                    for model_pass in model_passes
+                )
+            ]
+        )
+    return np.concatenate(blocks, axis=-1)
+
+
+def _ranks_above(values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    # For each value, how many reference values it beats, ties counting half.
+    reference = np.sort(reference)
+    below = np.searchsorted(reference, values, side='left')
+    not_above = np.searchsorted(reference, values, side='right')
+    return (below + not_above) / 2
+
+
+def _permutation_terms(
+    first: np.ndarray, second: np.ndarray, is_positive: np.ndarray, threshold: float
+) -> dict:
+    # Swapping the two models' scores on row i is a sign, +1 kept or -1
+    # swapped, and accuracy, the confusion counts and the ROC AUC difference
+    # are all linear in the signs: a constant plus signs @ coefficients. Only
+    # average precision needs the curves, from both models' rows sorted
+    # together once.
+    n_rows = len(is_positive)
+    positives = is_positive.sum()
+    negatives = n_rows - positives
+    first_predicted = (first >= threshold).astype(np.float64)
+    second_predicted = (second >= threshold).astype(np.float64)
+    predicted_change = (first_predicted - second_predicted) / 2
+
+    # With every row kept the ROC terms add up to the AUC difference: each
+    # (positive, negative) pair contributes half through each of its rows.
+    first_positive, first_negative = first[is_positive], first[~is_positive]
+    second_positive, second_negative = second[is_positive], second[~is_positive]
+    roc = np.empty(n_rows)
+    roc[is_positive] = (
+        _ranks_above(first_positive, first_negative)
+        + _ranks_above(first_positive, second_negative)
+        - _ranks_above(second_positive, second_negative)
+        - _ranks_above(second_positive, first_negative)
+    )
+    roc[~is_positive] = (
+        _ranks_above(second_negative, first_positive)
+        + _ranks_above(second_negative, second_positive)
+        - _ranks_above(first_negative, first_positive)
+        - _ranks_above(first_negative, second_positive)
+    )
+    roc /= 2 * positives * negatives
+
+    # Average precision needs the curves. Both models' rows are sorted
+    # together once and cut into segments that each end at a score with
+    # positive rows, the only scores where average precision changes. Model a
+    # takes row i's first score unless it is swapped, so its positive and
+    # negative count in each segment is a constant plus a sparse matrix times
+    # the swaps.
+    pooled_order, pooled_ends, _ = _sorted_pass(np.concatenate([first, second]))
+    pooled_positive = np.tile(is_positive, 2)
+    positives_above = np.cumsum(pooled_positive[pooled_order])[pooled_ends]
+    segment_ends = pooled_ends[np.diff(positives_above, prepend=0) > 0]
+    n_segments = len(segment_ends)
+    segments = np.empty(2 * n_rows, dtype=np.intp)
+    segments[pooled_order] = np.searchsorted(segment_ends, np.arange(2 * n_rows))
+    # Negative rows count in the second half of the segment counts.
+    counted = segments < n_segments
+    count_rows = (segments + np.where(pooled_positive, 0, n_segments))[counted]
+    segment_matrix = sp.csr_matrix(
+        (
+            np.repeat([-1.0, 1.0], n_rows)[counted],
+            (count_rows, np.tile(np.arange(n_rows), 2)[counted]),
+        ),
+        shape=(2 * n_segments, n_rows),
+    )
+
+    return {
+        'coefficients': np.column_stack(
+            [
+                (
+                    (first_predicted == is_positive).astype(np.float64)
+                    - (second_predicted == is_positive)
+                )
+                / n_rows,
+                predicted_change * is_positive,
+                predicted_change,
+                roc,
+            ]
+        ),
+        'mean_tp': np.sum((first_predicted + second_predicted) * is_positive) / 2,
+        'mean_predicted': np.sum(first_predicted + second_predicted) / 2,
+        'positives': positives,
+        'segment_matrix': segment_matrix,
+        'segment_counts': np.bincount(
+            count_rows[: counted[:n_rows].sum()], minlength=2 * n_segments
+        ),
+        'pooled_segment_counts': np.bincount(count_rows, minlength=2 * n_segments),
+    }
+
+
+def _permutation_task(
+    is_positive: np.ndarray,
+    terms: dict,
+    n_resamples: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    # Metric differences between two models after swapping their scores on a
+    # random half of the rows, shaped (metrics, resamples).
+    rng = np.random.default_rng(seed)
+    n_rows = len(is_positive)
+    n_segments = len(terms['segment_counts']) // 2
+    pooled_tps, pooled_fps = np.cumsum(
+        terms['pooled_segment_counts'].reshape(2, n_segments, 1), axis=1
+    )
+
+    blocks = []
+    for block in _blocks(n_resamples, MAX_CELLS // n_rows):
+        swapped = rng.integers(2, size=(n_rows, block), dtype=np.int8).astype(
+            np.float64
+        )
+        # signs @ coefficients, with signs = 1 - 2 * swapped.
+        accuracy, tp_change, predicted_change, roc_auc = (
+            terms['coefficients'].sum(axis=0)[:, None]
+            - 2 * terms['coefficients'].T @ swapped
+        )
+        first_f1, second_f1 = (
+            _divide(2 * tp, predicted + terms['positives'])
+            for tp, predicted in (
+                (
+                    terms['mean_tp'] + tp_change,
+                    terms['mean_predicted'] + predicted_change,
+                ),
+                (
+                    terms['mean_tp'] - tp_change,
+                    terms['mean_predicted'] - predicted_change,
+                ),
+            )
+        )
+
+        segment_counts = terms['segment_matrix'] @ swapped
+        segment_counts += terms['segment_counts'][:, None]
+        tps, fps = np.cumsum(segment_counts.reshape(2, n_segments, block), axis=1)
+        other_tps, other_fps = pooled_tps - tps, pooled_fps - fps
+        pr_auc = _average_precision(tps, fps, _steps(tps)) - _average_precision(
+            other_tps, other_fps, _steps(other_tps)
+        )
+        blocks.append(
+            {
+                'accuracy': accuracy,
+                'f1': first_f1 - second_f1,
+                'roc_auc': roc_auc,
+                'pr_auc': pr_auc,
+            }
+        )
+    return np.array(
+        [
+            np.concatenate([metrics[metric] for metrics in blocks])
+            for metric in BOOTSTRAP_METRICS
+        ]
+    )
+
+
+def _run_tasks(tasks: list, n_jobs: int) -> list:
+    plan = plan_parallelism(n_jobs, len(tasks))
+    with thread_limits(plan):
+        return Parallel(n_jobs=plan.search_n_jobs)(tasks)
+
+
+def compare_models(
+    y_true,
+    scores,
+    threshold: float | dict[str, float] = 0.5,
+    positive_label=1,
+    n_resamples: int = 10_000,
+    confidence: float = 0.95,
+    random_state: int = RANDOM_SEED,
+    n_jobs: int = -1,
+) -> pd.DataFrame:
+    # Paired bootstrap and permutation tests for every two models, one row per
+    # pair and metric. Resamples are split into tasks, each with its own seed,
+    # that run in a process pool.
+    if n_resamples < 1:
+        raise ValueError(f'n_resamples must be at least 1, got {n_resamples}.')
+    is_positive = np.asarray(y_true) == positive_label
+    if is_positive.all() or not is_positive.any():
+        raise ValueError('y_true needs both classes to compare the models.')
+    # Scores are shifted so every model's threshold is 0, which lets the
+    # permutation test swap scores between models with different thresholds.
+    scores = _score_matrix(scores)
+    scores = scores - [_model_threshold(threshold, name) for name in scores]
+    n_rows = len(scores)
+    names = list(scores)
+    pairs = list(combinations(range(len(names)), 2))
+    model_passes = [_model_pass(scores[name].to_numpy(), 0.0) for name in names]
+    observed = np.array(
+        [
+            [metrics[metric][0] for metric in BOOTSTRAP_METRICS]
+            for metrics in (
+                _pass_metrics(np.ones((n_rows, 1)), model_pass, is_positive)
+                for model_pass in model_passes
+            )
+        ]
+    )
+
+    task_blocks = _blocks(n_resamples, TASK_RESAMPLES)
+    seeds = iter(
+        np.random.SeedSequence(random_state).spawn((1 + len(pairs)) * len(task_blocks))
+    )
+    tasks = [
+        delayed(_bootstrap_task)(is_positive, model_passes, block, next(seeds))
+        for block in task_blocks
+    ]
+    for first, second in pairs:
+        terms = _permutation_terms(
+            scores[names[first]].to_numpy(),
+            scores[names[second]].to_numpy(),
+            is_positive,
+            0.0,
+        )
+        tasks += [
+            delayed(_permutation_task)(is_positive, terms, block, next(seeds))
+            for block in task_blocks
+        ]
+    results = _run_tasks(tasks, n_jobs)
+
+    bootstrapped = np.concatenate(results[: len(task_blocks)], axis=-1)
+    permuted = results[len(task_blocks) :]
+    tail = (1 - confidence) / 2 * 100
+    rows = {}
+    for pair_index, (first, second) in enumerate(pairs):
+        pair_permuted = np.concatenate(
+            permuted[
+                pair_index * len(task_blocks) : (pair_index + 1) * len(task_blocks)
+            ],
+            axis=-1,
+        )
+        for metric_index, metric in enumerate(BOOTSTRAP_METRICS):
+            difference = observed[first, metric_index] - observed[second, metric_index]
+            differences = (
+                bootstrapped[first, metric_index] - bootstrapped[second, metric_index]
+            )
+            differences = differences[~np.isnan(differences)]
+            null_differences = pair_permuted[metric_index]
+            # The metric can be undefined on every resample, e.g. F1 without
+            # positive predictions.
+            low = high = bootstrap_p_value = np.nan
+            if len(differences):
+                low, high = np.percentile(differences, [tail, 100 - tail])
+                # Two-sided: how often the resampled difference lands on the
+                # other side of zero.
+                bootstrap_p_value = min(
+                    1.0,
+                    2 * min(np.mean(differences <= 0), np.mean(differences >= 0)),
+                )
+            rows[names[first], names[second], metric] = {
+                'score_a': observed[first, metric_index],
+                'score_b': observed[second, metric_index],
+                'difference': difference,
+                'ci_low': low,
+                'ci_high': high,
+                'bootstrap_p_value': bootstrap_p_value,
+                'permutation_p_value': (
+                    1 + np.sum(np.abs(null_differences) >= abs(difference) - 1e-12)
+                )
+                / (1 + len(null_differences)),
+            }
+    comparison = pd.DataFrame.from_dict(rows, orient='index')
+    comparison.index.names = ['model_a', 'model_b', 'metric']
+    return comparison
+
+
+def _positive_scores(
+    model, X: pd.DataFrame, threshold: float = 0.5
+) -> tuple[np.ndarray, float]:
+    # Returns the scores with the threshold that matches them: the given one
+    # for probabilities, and 0, the sign the estimator predicts with, for
+    # decision functions.
+    classes = list(model.classes_)
+    positive = classes.index(POSITIVE_CLASS) if POSITIVE_CLASS in classes else -1
+    if hasattr(model, 'predict_proba'):
+        try:
+            return model.predict_proba(X)[:, positive], threshold
+        except AttributeError:
+            # SVC(probability=False) has predict_proba but cannot use it.
+            pass
+    return model.decision_function(X), 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Compare saved models on the test split with bootstrap intervals.'
+    )
+    parser.add_argument('model_paths', type=Path, nargs='+')
+    parser.add_argument('--base-path', type=Path, default=Path.cwd())
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.5,
+        help='Probability threshold; models without probabilities use the sign '
+        'of their decision function.',
+    )
+    parser.add_argument('--bootstraps', type=int, default=1000)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument(
+        '--compare',
+        type=int,
+        default=0,
+        metavar='N_RESAMPLES',
+        help='Also run paired bootstrap and permutation tests between every two '
+        'models with this many resamples.',
+    )
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args()
+
+    datasets = load_cached_datasets(args.base_path)
+    scores, thresholds = {}, {}
+    for model_path in args.model_paths:
+        # Models saved by projeto.train are named after their folder.
+        name = model_path.stem
+        if name in ('model', 'store'):
+            name = model_path.parent.name
+        scores[name], thresholds[name] = _positive_scores(
+            load_model(model_path), datasets.X_test, args.threshold
+        )
+
+    start = time.perf_counter()
+    report = evaluation_report(
+        datasets.y_test,
+        scores,
+        threshold=thresholds,
+        positive_label=POSITIVE_CLASS,
+        n_bootstraps=args.bootstraps,
+        confidence=args.confidence,
+    )
+    elapsed = time.perf_counter() - start
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(report.round(4).T)
+    print(f'\n{len(scores)} models, {args.bootstraps} resamples in {elapsed:.3f} s')
+
+    if args.compare and len(scores) > 1:
+        start = time.perf_counter()
+        comparison = compare_models(
+            datasets.y_test,
+            scores,
+            threshold=thresholds,
+            positive_label=POSITIVE_CLASS,
+            n_resamples=args.compare,
+            confidence=args.confidence,
+            n_jobs=args.n_jobs,
+        )
+        elapsed = time.perf_counter() - start
+        with pd.option_context(
+            'display.width', 200, 'display.max_rows', None, 'display.max_columns', None
+        ):
+            print(f'\n{comparison.round(4)}')
+        print(
+            f'\n{len(comparison) // len(BOOTSTRAP_METRICS)} pairs, {args.compare} '
+            f'resamples in {elapsed:.1f} s'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from joblib import Memory
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import check_cv
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.utils.validation import check_array, check_is_fitted
+
+from .config import DATA_FOLDER, FEATURE_CACHE_FOLDER, PROCESSED_DATASET_FOLDER
+
+NUMERICAL_FEATURES = ['age', 'education.num', 'hours.per.week']
+CATEGORICAL_FEATURES = [
+    'workclass',
+    'education',
+    'marital.status',
+    'occupation',
+    'relationship',
+    'race',
+    'sex',
+]
+
+
+def build_preprocessor(sparse: bool = False) -> ColumnTransformer:
+    pipe_num = Pipeline(
+        [
+            ('imputer', SimpleImputer(strategy='mean')),
+            ('scaler', StandardScaler()),
+        ]
+    )
+    pipe_cat = Pipeline(
+        [
+            ('imput', SimpleImputer(strategy='most_frequent')),
+            (
+                'hotEncoder',
+                OneHotEncoder(handle_unknown='ignore', sparse_output=sparse),
+            ),
+        ]
+    )
+    # With sparse=True the output is always CSR, whatever its density.
+    return ColumnTransformer(
+        [
+            ('num', pipe_num, NUMERICAL_FEATURES),
+            ('cat', pipe_cat, CATEGORICAL_FEATURES),
+        ],
+        remainder='passthrough',
+        sparse_threshold=1.0 if sparse else 0.3,
+    )
+
+
+# Sparse replacement for PolynomialFeatures(include_bias=False). Terms are
+# built one degree at a time by multiplying the previous degree's terms by one
+# more column, and only terms that are non-zero on some training row are kept:
+# products of dummies of the same categorical are mutually exclusive and never
+# survive, and neither do terms extended from them. Powers of 0/1 columns are
+# skipped too, since they equal the column itself. The dropped terms are zero
+# (or duplicates) on every training row, so a model fit on the output learns
+# nothing from them.
+class SparseInteractions(TransformerMixin, BaseEstimator):
+    def __init__(self, degree: int = 2) -> None:
+        self.degree = degree
+
+    def _validate_input(self, X) -> sp.csc_matrix:
+        return sp.csc_matrix(check_array(X, accept_sparse=['csr', 'csc'], dtype=float))
+
+    def _binary_columns(self, X: sp.csc_matrix) -> np.ndarray:
+        data_columns = np.repeat(np.arange(X.shape[1]), np.diff(X.indptr))
+        non_binary = data_columns[(X.data != 0) & (X.data != 1)]
+        return ~np.isin(np.arange(X.shape[1]), non_binary)
+
+    def fit(self, X, y=None) -> 'SparseInteractions':
+        X = self._validate_input(X)
+        self.n_features_in_ = X.shape[1]
+        binary = self._binary_columns(X)
+
+        # steps_[d] holds, for each column j, the positions of the degree d + 1
+        # terms that are multiplied by j to make the degree d + 2 terms.
+        self.steps_ = []
+        terms = X
+        last_columns = np.arange(X.shape[1])
+        for _ in range(2, self.degree + 1):
+            step, blocks, new_last_columns = [], [], []
+            for j in range(X.shape[1]):
+                # Each term is a sorted tuple of columns, so the new column
+                # comes last and every product is built exactly once.
+                allowed = (last_columns < j) | ((last_columns == j) & ~binary[j])
+                positions = np.flatnonzero(allowed)
+                products = self._multiply(terms, positions, X, j)
+                non_zero = products.getnnz(axis=0) > 0
+                step.append((j, positions[non_zero]))
+                blocks.append(products[:, non_zero])
+                new_last_columns.append(np.full(non_zero.sum(), j))
+            self.steps_.append(step)
+            terms = sp.hstack(blocks, format='csc')
+            last_columns = np.concatenate(new_last_columns)
+
+        self.n_output_features_ = X.shape[1] + sum(
+            len(positions) for step in self.steps_ for _, positions in step
+        )
+        return self
+
+    def _multiply(
+        self, terms: sp.csc_matrix, positions: np.ndarray, X: sp.csc_matrix, j: int
+    ) -> sp.csc_matrix:
+        column = X[:, j].toarray().ravel()
+        return sp.csc_matrix(sp.diags(column) @ terms[:, positions])
+
+    def transform(self, X) -> sp.csr_matrix:
+        check_is_fitted(self, 'steps_')
+        X = self._validate_input(X)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f'X has {X.shape[1]} features, but SparseInteractions was fit '
+                f'with {self.n_features_in_}.'
+            )
+
+        blocks = [X]
+        terms = X
+        for step in self.steps_:
+            terms = sp.hstack(
+                [self._multiply(terms, positions, X, j) for j, positions in step],
+                format='csc',
+            )
+            blocks.append(terms)
+        return sp.hstack(blocks, format='csr')
+
+
+def _feature_cache_folder(base_path: Path) -> Path:
+    return base_path / DATA_FOLDER / PROCESSED_DATASET_FOLDER / FEATURE_CACHE_FOLDER
+
+
+def feature_memory(base_path: Path, mmap_mode: str | None = 'r') -> Memory:
+    # Cached encodings are read back as read-only memory maps, so search
+    # workers share the same pages instead of each holding a copy.
+    return Memory(_feature_cache_folder(base_path), mmap_mode=mmap_mode, verbose=0)
+
+
+def clear_feature_cache(base_path: Path) -> None:
+    shutil.rmtree(_feature_cache_folder(base_path), ignore_errors=True)
+
+
+def build_pipeline(
+    steps: list[tuple[str, BaseEstimator | str]],
+    memory: Memory | None = None,
+    preprocessor: ColumnTransformer | None = None,
+) -> Pipeline:
+    # Pipeline caches the fit_transform of every step but the last, keyed by
+    # the step's parameters and the rows it is fit on. Within a search the
+    # preprocessor and the fold rows never change, so it is fit once per fold
+    # and every other candidate loads the encoded arrays from the cache.
+    if preprocessor is None:
+        preprocessor = build_preprocessor()
+    return Pipeline([('preprocessor', preprocessor), *steps], memory=memory)
+
+
+def warm_feature_cache(
+    X: pd.DataFrame,
+    y: pd.Series,
+    cv,
+    memory: Memory,
+    preprocessor: ColumnTransformer | None = None,
+) -> None:
+    # Encodes every fold up front, so parallel search workers start from a
+    # full cache instead of all encoding the same fold at once. The folds are
+    # built as in GridSearchCV, so the cache keys match the ones it uses.
+    if preprocessor is None:
+        preprocessor = build_preprocessor()
+    cv = check_cv(cv, y, classifier=True)
+    for train_positions, _ in cv.split(X, y):
+        pipeline = build_pipeline(
+            [('estimator', 'passthrough')], memory, clone(preprocessor)
+        )
+        pipeline.fit(X.iloc[train_positions], y.iloc[train_positions])
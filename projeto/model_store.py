@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import pickle
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.pipeline import Pipeline
+
+from . import predictor
+from .predictor import CompiledPredictor, export_predictor
+
+# Stores hold the arrays of a CompiledPredictor, so they cover the pipelines
+# export_predictor does: a ColumnTransformer followed by a dummy, logistic
+# (optionally on PolynomialFeatures or SparseInteractions), SVC, random forest
+# or gradient boosting classifier, or by a LinearSVC on a Nystroem map. Tree
+# ensembles are stored as precomputed bitvector tables, which take more space
+# than the pickled trees in exchange for scoring without walking them.
+MANIFEST_FILE = 'manifest.json'
+FORMAT_VERSION = 2
+ARRAY_ALIGNMENT = 64
+
+# Only these classes can be rebuilt from a manifest, so loading a store never
+# runs code named by the file the way pickle.load does.
+_STORED_CLASSES = {
+    cls.__name__: cls
+    for cls in (
+        predictor._FeatureMap,
+        predictor._LinearModel,
+        predictor._PolynomialModel,
+        predictor._BitvectorScorer,
+        predictor._NodeWalker,
+        predictor._ForestModel,
+        predictor._BoostingModel,
+        predictor._ConstantModel,
+        predictor._KernelModel,
+        predictor._NystroemModel,
+        CompiledPredictor,
+    )
+}
+
+
+def _encode(value, arrays: list[np.ndarray]):
+    # Arrays are replaced by their index in arrays, and everything else by
+    # JSON values tagged with how to rebuild them.
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return {'strings': [str(item) for item in value]}
+        arrays.append(np.ascontiguousarray(value))
+        return {'array': len(arrays) - 1}
+    if isinstance(value, pd.Index):
+        return {'index': [str(item) for item in value]}
+    if isinstance(value, type) and issubclass(value, np.generic):
+        return {'dtype': np.dtype(value).name}
+    if type(value).__name__ in _STORED_CLASSES:
+        return {
+            'class': type(value).__name__,
+            'state': {
+                name: _encode(attribute, arrays)
+                for name, attribute in vars(value).items()
+            },
+        }
+    if isinstance(value, (list, tuple)):
+        return {'list': [_encode(item, arrays) for item in value]}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f'Cannot store values of type {type(value).__name__}.')
+
+
+def _decode(value, arrays: list[np.ndarray]):
+    if not isinstance(value, dict):
+        return value
+    if 'array' in value:
+        return arrays[value['array']]
+    if 'strings' in value:
+        return np.array(value['strings'], dtype=object)
+    if 'index' in value:
+        return pd.Index(value['index'])
+    if 'dtype' in value:
+        return np.dtype(value['dtype']).type
+    if 'list' in value:
+        return [_decode(item, arrays) for item in value['list']]
+    if 'class' in value:
+        if value['class'] not in _STORED_CLASSES:
+            raise ValueError(f'Unknown class in model manifest: {value["class"]}')
+        obj = object.__new__(_STORED_CLASSES[value['class']])
+        vars(obj).update(
+            {name: _decode(item, arrays) for name, item in value['state'].items()}
+        )
+        return obj
+    raise ValueError(f'Unknown value in model manifest: {value}')
+
+
+def _write_weights(weights_path: Path, arrays: list[np.ndarray]) -> list[dict]:
+    # Every array starts on an aligned offset of a single file, so loading maps
+    # the file once and takes views of it.
+    layout, offset = [], 0
+    with open(weights_path, 'wb') as weights_file:
+        for array in arrays:
+            offset = -(-offset // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+            weights_file.seek(offset)
+            weights_file.write(array.tobytes())
+            layout.append(
+                {'offset': offset, 'dtype': array.dtype.str, 'shape': array.shape}
+            )
+            offset += array.nbytes
+        weights_file.truncate(offset)
+    return layout
+
+
+def _map_weights(weights_path: Path, layout: list[dict]) -> list[np.ndarray]:
+    if not layout or weights_path.stat().st_size == 0:
+        buffer = np.empty(0, dtype=np.uint8)
+    else:
+        buffer = np.memmap(weights_path, dtype=np.uint8, mode='r')
+    arrays = []
+    for entry in layout:
+        dtype = np.dtype(entry['dtype'])
+        n_bytes = dtype.itemsize * int(np.prod(entry['shape']))
+        arrays.append(
+            buffer[entry['offset'] : entry['offset'] + n_bytes]
+            .view(dtype)
+            .reshape(entry['shape'])
+        )
+    return arrays
+
+
+def save_model(
+    model: Pipeline | CompiledPredictor, store_path: Path, metrics: dict | None = None
+) -> Path:
+    compiled = (
+        model if isinstance(model, CompiledPredictor) else export_predictor(model)
+    )
+    arrays: list[np.ndarray] = []
+    encoded = _encode(compiled, arrays)
+
+    # Every save writes a new weights file: rewriting one in place would pull
+    # the pages from under the processes that have it mapped.
+    store_path.mkdir(parents=True, exist_ok=True)
+    weights_file = f'weights-{uuid.uuid4().hex}.bin'
+    temporary_weights_path = store_path / f'{weights_file}.tmp'
+    layout = _write_weights(temporary_weights_path, arrays)
+    os.replace(temporary_weights_path, store_path / weights_file)
+    features = compiled.features
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'sklearn_version': sklearn.__version__,
+        'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'feature_names': [str(col) for col in compiled.feature_names_in_],
+        'numerical_features': features.numerical_cols + features.passthrough_cols,
+        'categories': {
+            col: [str(category) for category in categories]
+            for col, categories in zip(features.categorical_cols, features.categories)
+        },
+        'classes': [_encode(label, []) for label in compiled.classes_],
+        'metrics': {
+            name: _encode(value, []) for name, value in (metrics or {}).items()
+        },
+        'model': type(compiled.model).__name__,
+        'weights_file': weights_file,
+        'arrays': layout,
+        'predictor': encoded,
+    }
+    # The manifest is written last and atomically: a store without one is
+    # incomplete and is not loaded.
+    manifest_path = store_path / MANIFEST_FILE
+    temporary_path = manifest_path.with_suffix('.tmp')
+    temporary_path.write_text(json.dumps(manifest, indent=4))
+    os.replace(temporary_path, manifest_path)
+
+    # Processes that mapped the older weights keep them until they unmap.
+    for weights_path in store_path.glob('weights*.bin'):
+        if weights_path.name != weights_file:
+            weights_path.unlink(missing_ok=True)
+    return store_path
+
+
+def read_manifest(store_path: Path) -> dict:
+    manifest = json.loads((store_path / MANIFEST_FILE).read_text())
+    if manifest['format_version'] != FORMAT_VERSION:
+        raise ValueError(
+            f'Unsupported model store version {manifest["format_version"]}, '
+            f'expected {FORMAT_VERSION}.'
+        )
+    return manifest
+
+
+def load_model(store_path: Path) -> CompiledPredictor:
+    # Weights are memory-mapped read-only: pages are read on first use and
+    # shared by every process that loads the same store. A save between
+    # reading the manifest and mapping its weights removes them, in which
+    # case the new manifest is read.
+    manifest = read_manifest(store_path)
+    try:
+        arrays = _map_weights(store_path / manifest['weights_file'], manifest['arrays'])
+    except FileNotFoundError:
+        manifest = read_manifest(store_path)
+        arrays = _map_weights(store_path / manifest['weights_file'], manifest['arrays'])
+    return _decode(manifest['predictor'], arrays)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Convert pickled pipelines into memory-mappable model stores.'
+    )
+    parser.add_argument('pickle_paths', type=Path, nargs='+')
+    parser.add_argument(
+        '--output-folder',
+        type=Path,
+        default=None,
+        help='Defaults to a folder named after each pickle, next to it.',
+    )
+    args = parser.parse_args()
+
+    for pickle_path in args.pickle_paths:
+        output_folder = args.output_folder or pickle_path.parent
+        store_path = output_folder / pickle_path.stem
+        try:
+            with open(pickle_path, 'rb') as model_file:
+                model = pickle.load(model_file)
+            save_model(model, store_path)
+        # Pickles from other sklearn versions may name modules that are gone.
+        except (TypeError, ImportError, pickle.UnpicklingError) as error:
+            print(f'{pickle_path}: skipped, {error}')
+            continue
+        weights_path = store_path / read_manifest(store_path)['weights_file']
+        size = weights_path.stat().st_size
+        print(f'{pickle_path} -> {store_path} ({size / 1024:.0f} KB of weights)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import pandas as pd
+from joblib import effective_n_jobs, parallel_config
+from sklearn.base import BaseEstimator, clone, is_classifier
+from sklearn.model_selection import ParameterGrid, check_cv
+from threadpoolctl import threadpool_limits
+
+
+@dataclass(frozen=True)
+class ParallelPlan:
+    n_cores: int
+    search_n_jobs: int
+    estimator_n_jobs: int
+    threads_per_worker: int
+
+
+def _n_search_tasks(estimator: BaseEstimator, y: pd.Series) -> int:
+    # Fits the search can run at once: every grid point on every fold. For
+    # successive halving this is the first, widest round.
+    param_grid = getattr(estimator, 'param_grid', None)
+    if param_grid is None:
+        return 1
+    cv = check_cv(estimator.cv, y, classifier=is_classifier(estimator.estimator))
+    return len(ParameterGrid(param_grid)) * cv.get_n_splits()
+
+
+def plan_parallelism(n_cores: int, n_tasks: int) -> ParallelPlan:
+    # Independent fits parallelize best, so they get the cores first; cores
+    # left over once every fit has a worker go to threads inside each fit.
+    n_cores = effective_n_jobs(n_cores)
+    search_n_jobs = max(min(n_cores, n_tasks), 1)
+    threads_per_worker = max(n_cores // search_n_jobs, 1)
+    return ParallelPlan(
+        n_cores=n_cores,
+        search_n_jobs=search_n_jobs,
+        estimator_n_jobs=threads_per_worker,
+        threads_per_worker=threads_per_worker,
+    )
+
+
+def _estimator_n_jobs_params(estimator: BaseEstimator) -> list[str]:
+    # The n_jobs of the search itself is set from the plan separately.
+    return [
+        name
+        for name in estimator.get_params(deep=True)
+        if name.endswith('n_jobs') and name != 'n_jobs'
+    ]
+
+
+def apply_plan(estimator: BaseEstimator, plan: ParallelPlan) -> BaseEstimator:
+    params = {
+        name: plan.estimator_n_jobs for name in _estimator_n_jobs_params(estimator)
+    }
+    if hasattr(estimator, 'param_grid'):
+        params['n_jobs'] = plan.search_n_jobs
+    elif 'n_jobs' in estimator.get_params(deep=False):
+        params['n_jobs'] = plan.estimator_n_jobs
+    return estimator.set_params(**params)
+
+
+@contextmanager
+def thread_limits(plan: ParallelPlan) -> Iterator[None]:
+    # Caps BLAS and OpenMP pools both in the search workers and in this
+    # process, which runs the sequential fits.
+    with (
+        parallel_config(backend='loky', inner_max_num_threads=plan.threads_per_worker),
+        threadpool_limits(limits=plan.threads_per_worker),
+    ):
+        yield
+
+
+def fit_with_budget(
+    estimator: BaseEstimator, X: pd.DataFrame, y: pd.Series, n_cores: int = -1
+) -> BaseEstimator:
+    plan = plan_parallelism(n_cores, _n_search_tasks(estimator, y))
+    refit = getattr(estimator, 'refit', False)
+    if refit is not True or plan.search_n_jobs == 1:
+        apply_plan(estimator, plan)
+        with thread_limits(plan):
+            return estimator.fit(X, y)
+
+    # The search splits the cores among its workers, but the refit runs alone
+    # in this process, so it is done here with the whole budget.
+    apply_plan(estimator.set_params(refit=False), plan)
+    try:
+        with thread_limits(plan):
+            estimator.fit(X, y)
+    finally:
+        estimator.set_params(refit=refit)
+
+    refit_plan = plan_parallelism(plan.n_cores, 1)
+    best_estimator = apply_plan(
+        clone(estimator.estimator).set_params(
+            **clone(estimator.best_params_, safe=False)
+        ),
+        refit_plan,
+    )
+    start = time.perf_counter()
+    with thread_limits(refit_plan):
+        estimator.best_estimator_ = best_estimator.fit(X, y)
+    estimator.refit_time_ = time.perf_counter() - start
+    if hasattr(best_estimator, 'feature_names_in_'):
+        estimator.feature_names_in_ = best_estimator.feature_names_in_
+    return estimator
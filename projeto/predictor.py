@@ -0,0 +1,877 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.special import expit
+from sklearn.compose import ColumnTransformer
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier,
+)
+from sklearn.impute import SimpleImputer
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import (
+    FunctionTransformer,
+    OneHotEncoder,
+    PolynomialFeatures,
+    StandardScaler,
+)
+from sklearn.svm import SVC, LinearSVC
+from sklearn.utils.metaestimators import available_if
+
+from .dataset import load_schema
+from .features import SparseInteractions
+
+
+def _is_passthrough(transformer) -> bool:
+    # Fitted ColumnTransformers keep passthrough columns as an identity
+    # FunctionTransformer.
+    return transformer == 'passthrough' or (
+        isinstance(transformer, FunctionTransformer) and transformer.func is None
+    )
+
+
+def _column_names(column_transformer: ColumnTransformer, columns) -> list[str]:
+    # The remainder may be given by position rather than by name.
+    if len(columns) and not isinstance(columns[0], str):
+        return list(column_transformer.feature_names_in_[columns])
+    return list(columns)
+
+
+def _check_missing_is_nan(imputer: SimpleImputer) -> None:
+    if not pd.isna(imputer.missing_values):
+        raise TypeError('Only imputers of NaN missing values can be exported.')
+
+
+def _row_blocks(columns: dict[str, np.ndarray], n_rows: int, block_size: int):
+    for start in range(0, n_rows, block_size):
+        stop = min(start + block_size, n_rows)
+        yield {col: values[start:stop] for col, values in columns.items()}, stop - start
+
+
+# The fitted ColumnTransformer as plain arrays: imputation fills and scaler
+# statistics for the numerical columns, and for each categorical column a table
+# from schema category code to its one-hot output position. Slot 0 of a table
+# is for missing values and points at the imputed category; categories the
+# encoder never saw point at -1, the all-zero row of handle_unknown='ignore'.
+# The last slot is for values outside the schema, which the encoder has not
+# seen either.
+class _FeatureMap:
+    def __init__(self, column_transformer: ColumnTransformer) -> None:
+        schema = load_schema()
+        self.numerical_cols: list[str] = []
+        self.fill_values = np.empty(0)
+        self.means = np.empty(0)
+        self.scales = np.empty(0)
+        self.numerical_positions = np.empty(0, dtype=np.intp)
+        self.passthrough_cols: list[str] = []
+        self.passthrough_positions = np.empty(0, dtype=np.intp)
+        self.categorical_cols: list[str] = []
+        self.categories: list[pd.Index] = []
+        self.lookups: list[np.ndarray] = []
+        self.n_features_out = sum(
+            output.stop - output.start
+            for output in column_transformer.output_indices_.values()
+        )
+
+        for name, transformer, columns in column_transformer.transformers_:
+            output = column_transformer.output_indices_[name]
+            positions = np.arange(output.start, output.stop)
+            if transformer == 'drop' or len(positions) == 0:
+                continue
+            columns = _column_names(column_transformer, columns)
+
+            if _is_passthrough(transformer):
+                self.passthrough_cols += columns
+                self.passthrough_positions = np.concatenate(
+                    [self.passthrough_positions, positions]
+                )
+                continue
+
+            steps = [step for _, step in getattr(transformer, 'steps', [])]
+            step_types = [type(step) for step in steps]
+            if step_types == [SimpleImputer, StandardScaler]:
+                imputer, scaler = steps
+                _check_missing_is_nan(imputer)
+                n_columns = len(columns)
+                self.numerical_cols += columns
+                self.fill_values = np.concatenate(
+                    [self.fill_values, imputer.statistics_]
+                )
+                self.means = np.concatenate(
+                    [
+                        self.means,
+                        scaler.mean_ if scaler.with_mean else np.zeros(n_columns),
+                    ]
+                )
+                self.scales = np.concatenate(
+                    [
+                        self.scales,
+                        scaler.scale_ if scaler.with_std else np.ones(n_columns),
+                    ]
+                )
+                self.numerical_positions = np.concatenate(
+                    [self.numerical_positions, positions]
+                )
+            elif step_types == [SimpleImputer, OneHotEncoder]:
+                imputer, encoder = steps
+                _check_missing_is_nan(imputer)
+                if encoder.drop_idx_ is not None or encoder._infrequent_enabled:
+                    raise TypeError(
+                        'Only OneHotEncoders without drop or infrequent categories '
+                        'can be exported.'
+                    )
+                offsets = np.cumsum([0] + [len(c) for c in encoder.categories_])
+                for i, col in enumerate(columns):
+                    self._add_categorical(
+                        col,
+                        schema[col].categories,
+                        encoder.categories_[i],
+                        imputer.statistics_[i],
+                        positions[offsets[i] :],
+                    )
+            else:
+                raise TypeError(f'Cannot export the {name} transformer: {transformer}')
+
+    def _add_categorical(
+        self,
+        col: str,
+        schema_categories: pd.Index,
+        encoder_categories: np.ndarray,
+        imputed_category,
+        positions: np.ndarray,
+    ) -> None:
+        encoder_positions = {
+            category: positions[i] for i, category in enumerate(encoder_categories)
+        }
+        lookup = np.array(
+            [encoder_positions[imputed_category]]
+            + [encoder_positions.get(category, -1) for category in schema_categories]
+            + [-1],
+            dtype=np.intp,
+        )
+        self.categorical_cols.append(col)
+        self.categories.append(schema_categories)
+        self.lookups.append(lookup)
+
+    def input_columns(self, X) -> dict[str, np.ndarray]:
+        columns = {}
+        for col in self.numerical_cols + self.passthrough_cols:
+            columns[col] = np.asarray(X[col], dtype=np.float64)
+        for col, categories in zip(self.categorical_cols, self.categories):
+            values = X[col]
+            if isinstance(
+                values.dtype, pd.CategoricalDtype
+            ) and values.cat.categories.equals(categories):
+                codes = np.asarray(values.cat.codes)
+            else:
+                codes = pd.Categorical(values, categories=categories).codes
+                # Values outside the schema go to the last slot, not the
+                # missing one.
+                outside = (codes == -1) & np.asarray(pd.notna(values))
+                codes = np.where(outside, len(categories), codes)
+            columns[col] = codes.astype(np.intp) + 1
+        return columns
+
+    def scaled_numerical(self, columns: dict[str, np.ndarray]) -> np.ndarray:
+        # Same operations, in the same order, as SimpleImputer + StandardScaler.
+        values = np.column_stack([columns[col] for col in self.numerical_cols])
+        values = np.where(np.isnan(values), self.fill_values, values)
+        values -= self.means
+        values /= self.scales
+        return values
+
+    def dense(self, columns: dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+        X = np.zeros((n_rows, self.n_features_out))
+        if self.numerical_cols:
+            X[:, self.numerical_positions] = self.scaled_numerical(columns)
+        for col, position in zip(self.passthrough_cols, self.passthrough_positions):
+            X[:, position] = columns[col]
+        rows = np.arange(n_rows)
+        for col, lookup in zip(self.categorical_cols, self.lookups):
+            positions = lookup[columns[col]]
+            known = positions >= 0
+            X[rows[known], positions[known]] = 1.0
+        return X
+
+
+# Binary logistic regression on the one-hot features is a sparse dot product
+# with exactly one non-zero per categorical column, so each column's part of
+# the decision function is a coefficient gathered by category code.
+class _LinearModel:
+    def __init__(self, model: LogisticRegression, features: _FeatureMap) -> None:
+        if model.coef_.shape[0] != 1:
+            raise TypeError('Only binary logistic regressions can be exported.')
+        coef = model.coef_[0]
+        self.intercept = model.intercept_[0]
+        self.numerical_coef = coef[features.numerical_positions]
+        self.passthrough_coef = coef[features.passthrough_positions]
+        # The extra last entry is the zero contribution of unknown categories.
+        coef_with_unknown = np.append(coef, 0.0)
+        self.category_coefs = [coef_with_unknown[lookup] for lookup in features.lookups]
+
+    def predict_proba(
+        self, features: _FeatureMap, columns: dict[str, np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        decision = np.full(n_rows, self.intercept)
+        if features.numerical_cols:
+            decision += features.scaled_numerical(columns) @ self.numerical_coef
+        for col, coef in zip(features.passthrough_cols, self.passthrough_coef):
+            decision += columns[col] * coef
+        for col, category_coef in zip(features.categorical_cols, self.category_coefs):
+            decision += category_coef[columns[col]]
+        probability = expit(decision)
+        return np.column_stack([1 - probability, probability])
+
+
+def _polynomial_levels(transformer, n_inputs: int) -> tuple[list, list[tuple]]:
+    # Groups the terms by degree. Every term of degree d is a term of degree
+    # d - 1 (its parent) times one more input column, so each level lists its
+    # terms' output positions, their parents' indices in the level below and
+    # the input columns.
+    inputs = np.arange(n_inputs)
+    if isinstance(transformer, SparseInteractions):
+        # The inputs come first, then each degree's terms in the order of the
+        # fitted steps, whose positions already index the level below.
+        levels, start = [(inputs, None, inputs)], n_inputs
+        for step in transformer.steps_:
+            parents = np.concatenate(
+                [np.empty(0, dtype=np.intp)] + [positions for _, positions in step]
+            )
+            columns = np.concatenate(
+                [np.empty(0, dtype=np.intp)]
+                + [np.full(len(positions), j) for j, positions in step]
+            )
+            levels.append((np.arange(start, start + len(parents)), parents, columns))
+            start += len(parents)
+        return [], levels
+
+    terms = {
+        tuple(np.repeat(inputs, powers)): position
+        for position, powers in enumerate(transformer.powers_)
+    }
+    if any((column,) not in terms for column in inputs):
+        raise TypeError('Only PolynomialFeatures with min_degree=1 can be exported.')
+    bias = [terms[()]] if () in terms else []
+    levels = [(np.array([terms[(column,)] for column in inputs]), None, inputs)]
+    previous = [(column,) for column in inputs]
+    for degree in range(2, max(len(term) for term in terms) + 1):
+        level_terms = [term for term in terms if len(term) == degree]
+        parent_index = {term: i for i, term in enumerate(previous)}
+        levels.append(
+            (
+                np.array([terms[term] for term in level_terms], dtype=np.intp),
+                np.array([parent_index[term[:-1]] for term in level_terms], np.intp),
+                np.array([term[-1] for term in level_terms], dtype=np.intp),
+            )
+        )
+        previous = level_terms
+    return bias, levels
+
+
+# Logistic regression on polynomial terms, evaluated Horner-style instead of
+# building the terms: the coefficients of the highest degree are a dense
+# (parent, input column) matrix, so one matrix product folds them into a
+# weight per parent term, and each lower degree folds its weights into its
+# parents with a sum over their children. Rows are scored in blocks that keep
+# the weights under max_cells values.
+class _PolynomialModel:
+    max_cells = 2**22
+
+    def __init__(
+        self, transformer, model: LogisticRegression, features: _FeatureMap
+    ) -> None:
+        if model.coef_.shape[0] != 1:
+            raise TypeError('Only binary logistic regressions can be exported.')
+        coef = model.coef_[0]
+        bias, levels = _polynomial_levels(transformer, features.n_features_out)
+        self.intercept = model.intercept_[0] + coef[bias].sum()
+        self.input_coef = coef[levels[0][0]]
+
+        self.top_coef = np.zeros((0, len(self.input_coef)))
+        if len(levels) > 1:
+            positions, parents, columns = levels[-1]
+            self.top_coef = np.zeros((len(levels[-2][0]), len(self.input_coef)))
+            self.top_coef[parents, columns] = coef[positions]
+
+        # Children sorted by parent, so their sums are one reduceat per level.
+        self.level_coef, self.level_order, self.level_columns = [], [], []
+        self.level_starts, self.level_parents, self.parent_sizes = [], [], []
+        for (positions, parents, columns), below in zip(levels[1:-1], levels):
+            order = np.argsort(parents, kind='stable')
+            starts = np.flatnonzero(np.diff(parents[order], prepend=-1))
+            self.level_coef.append(coef[positions])
+            self.level_order.append(order)
+            self.level_columns.append(columns[order])
+            self.level_starts.append(starts)
+            self.level_parents.append(parents[order][starts])
+            self.parent_sizes.append(len(below[0]))
+        self.n_weights = max(len(coef) for coef in [self.input_coef] + self.level_coef)
+
+    def _weights(self, X: np.ndarray) -> np.ndarray:
+        weights = X @ self.top_coef.T
+        for coef, order, columns, starts, parents, n_parents in zip(
+            self.level_coef[::-1],
+            self.level_order[::-1],
+            self.level_columns[::-1],
+            self.level_starts[::-1],
+            self.level_parents[::-1],
+            self.parent_sizes[::-1],
+        ):
+            weights += coef
+            children = X[:, columns] * weights[:, order]
+            weights = np.zeros((len(X), n_parents))
+            if len(starts):
+                weights[:, parents] = np.add.reduceat(children, starts, axis=1)
+        return weights
+
+    def predict_proba(
+        self, features: _FeatureMap, columns: dict[str, np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        block_size = max(self.max_cells // self.n_weights, 1)
+        decision = [np.empty(0)]
+        for block_columns, n_block in _row_blocks(columns, n_rows, block_size):
+            X = features.dense(block_columns, n_block)
+            weights = self.input_coef
+            if len(self.top_coef):
+                weights = self._weights(X) + weights
+            decision.append(np.einsum('ij,ij->i', X, np.broadcast_to(weights, X.shape)))
+        probability = expit(np.concatenate(decision) + self.intercept)
+        return np.column_stack([1 - probability, probability])
+
+
+def _leaf_order(tree: dict) -> tuple[list[int], dict[int, int]]:
+    # Leaves numbered left to right, and for every internal node the bits of
+    # the leaves in its left subtree.
+    leaf_nodes, left_bits = [], {}
+
+    def visit(node: int) -> tuple[int, int]:
+        if tree['is_leaf'][node]:
+            leaf_nodes.append(node)
+            return len(leaf_nodes) - 1, len(leaf_nodes)
+        first, middle = visit(tree['lefts'][node])
+        _, stop = visit(tree['rights'][node])
+        left_bits[node] = (1 << middle) - (1 << first)
+        return first, stop
+
+    visit(0)
+    return leaf_nodes, left_bits
+
+
+# Scores trees of at most 64 leaves without walking them (QuickScorer). A
+# node whose test fails rules out the leaves of its left subtree, so each row
+# keeps one 64-bit mask per tree, ANDs in the masks of every failed test and
+# exits at the leftmost leaf left. Failed tests depend on one input value
+# only: for a numerical column they are a prefix of its sorted thresholds, and
+# for a categorical column they are fixed by the category code, so both are
+# precomputed as tables of ANDed masks and rows never touch the one-hot
+# matrix.
+class _BitvectorScorer:
+    max_leaves = 64
+    max_slots = 1024
+
+    def __init__(self, trees: list[dict], offsets: np.ndarray, features: _FeatureMap):
+        n_trees = len(trees)
+        all_leaves = np.uint64(2**64 - 1)
+        self.leaf_nodes = np.zeros((n_trees, self.max_leaves), dtype=np.intp)
+        nodes_by_position: dict[int, list[tuple]] = {}
+        for tree_index, (tree, offset) in enumerate(zip(trees, offsets)):
+            leaf_nodes, left_bits = _leaf_order(tree)
+            self.leaf_nodes[tree_index, : len(leaf_nodes)] = np.add(leaf_nodes, offset)
+            for node, bits in left_bits.items():
+                nodes_by_position.setdefault(tree['features'][node], []).append(
+                    (
+                        tree['thresholds'][node],
+                        tree_index,
+                        np.uint64(bits) ^ all_leaves,
+                        tree['missing_go_to_left'][node],
+                    )
+                )
+
+        # One table of masks per input column, indexed by the position of the
+        # value among the column's thresholds (the last row is for missing
+        # values) or by its category code.
+        numerical_positions = np.concatenate(
+            [features.numerical_positions, features.passthrough_positions]
+        )
+        self.thresholds, tables = [], []
+        for position in numerical_positions:
+            nodes = sorted(nodes_by_position.pop(position, []), key=lambda n: n[0])
+            masks = np.full((len(nodes) + 2, n_trees), all_leaves)
+            for k, (_, tree_index, mask, missing_go_to_left) in enumerate(nodes):
+                masks[k + 1 : -1, tree_index] &= mask
+                if not missing_go_to_left:
+                    masks[-1, tree_index] &= mask
+            self.thresholds.append(np.array([node[0] for node in nodes]))
+            tables.append(masks)
+
+        for lookup in features.lookups:
+            masks = np.full((len(lookup), n_trees), all_leaves)
+            for position in np.unique(lookup[lookup >= 0]):
+                for threshold, tree_index, mask, _ in nodes_by_position.pop(
+                    position, []
+                ):
+                    # The dummy is 1 for its own category and 0 for the rest.
+                    fails = np.where(lookup == position, 1.0, 0.0) > threshold
+                    masks[fails, tree_index] &= mask
+            tables.append(masks)
+
+        if nodes_by_position:
+            raise TypeError('The trees split on features the pipeline does not make.')
+
+        # Neighbouring tables are merged into joint tables over the product of
+        # their indices while that stays under max_slots rows, so each row
+        # needs fewer gathers. Columns without any split are left out.
+        self.groups: list[tuple[list[tuple[int, int]], np.ndarray]] = []
+        for input_index, table in enumerate(tables):
+            if (table == all_leaves).all():
+                continue
+            if self.groups and len(self.groups[-1][1]) * len(table) <= self.max_slots:
+                members, joint = self.groups[-1]
+                joint = (joint[:, None, :] & table[None, :, :]).reshape(-1, n_trees)
+                self.groups[-1] = (members + [(input_index, len(table))], joint)
+            else:
+                self.groups.append(([(input_index, len(table))], table))
+
+    def leaves(
+        self,
+        features: _FeatureMap,
+        columns: dict[str, np.ndarray],
+        n_rows: int,
+        input_dtype: type,
+    ) -> np.ndarray:
+        numerical_values = []
+        if features.numerical_cols:
+            numerical_values = list(features.scaled_numerical(columns).T)
+        numerical_values += [columns[col] for col in features.passthrough_cols]
+
+        indices = []
+        for values, thresholds in zip(numerical_values, self.thresholds):
+            values = values.astype(input_dtype)
+            value_indices = np.searchsorted(thresholds, values, side='left')
+            value_indices[np.isnan(values)] = len(thresholds) + 1
+            indices.append(value_indices)
+        indices += [columns[col] for col in features.categorical_cols]
+
+        state = np.full((n_rows, len(self.leaf_nodes)), np.uint64(2**64 - 1))
+        for members, joint in self.groups:
+            joint_indices = np.zeros(n_rows, dtype=np.intp)
+            for input_index, size in members:
+                joint_indices = joint_indices * size + indices[input_index]
+            state &= joint[joint_indices]
+
+        # The lowest set bit is a power of two, exact in float64.
+        lowest_bit = state & (~state + np.uint64(1))
+        leaf_positions = np.frexp(lowest_bit.astype(np.float64))[1] - 1
+        return self.leaf_nodes[np.arange(len(self.leaf_nodes)), leaf_positions]
+
+
+# Fallback for deeper trees: every tree in one set of node arrays, with child
+# indices offset into the shared arrays, walked one level per step over the
+# (row, tree) pairs that have not reached a leaf yet.
+class _NodeWalker:
+    def __init__(self, flattened: dict) -> None:
+        self.features = np.where(flattened['is_leaf'], 0, flattened['features'])
+        self.thresholds = flattened['thresholds']
+        self.lefts = flattened['lefts']
+        self.rights = flattened['rights']
+        self.missing_go_to_left = flattened['missing_go_to_left'].astype(bool)
+        self.is_leaf = flattened['is_leaf'].astype(bool)
+        self.roots = flattened['roots']
+
+    def leaves(
+        self,
+        features: _FeatureMap,
+        columns: dict[str, np.ndarray],
+        n_rows: int,
+        input_dtype: type,
+    ) -> np.ndarray:
+        X = features.dense(columns, n_rows).astype(input_dtype)
+        n_features = X.shape[1]
+        X = X.ravel()
+        n_trees = len(self.roots)
+        nodes = np.tile(self.roots, n_rows)
+        row_starts = np.repeat(np.arange(n_rows) * n_features, n_trees)
+        has_missing = np.isnan(X).any()
+
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while len(active):
+            current = nodes[active]
+            values = X[row_starts[active] + self.features[current]]
+            go_left = values <= self.thresholds[current]
+            if has_missing:
+                go_left = np.where(
+                    np.isnan(values), self.missing_go_to_left[current], go_left
+                )
+            nodes[active] = np.where(go_left, self.lefts[current], self.rights[current])
+            active = active[~self.is_leaf[nodes[active]]]
+        return nodes.reshape(n_rows, n_trees)
+
+
+def _flatten_trees(trees: list[dict]) -> tuple[dict, np.ndarray]:
+    offsets = np.cumsum([0] + [len(tree['features']) for tree in trees])
+    flattened = {
+        name: np.concatenate([tree[name] for tree in trees])
+        for name in ('features', 'thresholds', 'missing_go_to_left', 'is_leaf')
+    }
+    for name in ('lefts', 'rights'):
+        flattened[name] = np.concatenate(
+            [
+                np.where(tree['is_leaf'], 0, tree[name]) + offset
+                for tree, offset in zip(trees, offsets)
+            ]
+        )
+    flattened['values'] = np.concatenate([tree['values'] for tree in trees])
+    flattened['roots'] = offsets[:-1]
+    return flattened, offsets[:-1]
+
+
+# Shared by the forest and boosting models: the leaf values of every tree in
+# one array, and a scorer that finds the leaf each row reaches in each tree.
+# Rows go through in blocks so the (rows, trees) arrays stay under
+# max_cells entries.
+class _TreeModel:
+    max_cells = 2**22
+
+    def __init__(self, trees: list[dict], features: _FeatureMap, input_dtype: type):
+        flattened, offsets = _flatten_trees(trees)
+        self.leaf_values = flattened['values']
+        self.n_trees = len(trees)
+        self.input_dtype = input_dtype
+        n_leaves = max(int(np.sum(tree['is_leaf'])) for tree in trees)
+        if n_leaves <= _BitvectorScorer.max_leaves:
+            self.scorer = _BitvectorScorer(trees, offsets, features)
+        else:
+            self.scorer = _NodeWalker(flattened)
+
+    def leaves(
+        self, features: _FeatureMap, columns: dict[str, np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        block_size = max(self.max_cells // self.n_trees, 1)
+        return np.concatenate(
+            [
+                self.scorer.leaves(features, block_columns, n_block, self.input_dtype)
+                for block_columns, n_block in _row_blocks(columns, n_rows, block_size)
+            ]
+        )
+
+
+def _sklearn_tree(tree) -> dict:
+    values = tree.value[:, 0, :]
+    normalizer = values.sum(axis=1, keepdims=True)
+    normalizer[normalizer == 0.0] = 1.0
+    return {
+        'features': tree.feature,
+        'thresholds': tree.threshold,
+        'lefts': tree.children_left,
+        'rights': tree.children_right,
+        'missing_go_to_left': getattr(
+            tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8)
+        ),
+        'is_leaf': tree.children_left == -1,
+        'values': values / normalizer,
+    }
+
+
+class _ForestModel(_TreeModel):
+    def __init__(self, model: RandomForestClassifier, features: _FeatureMap) -> None:
+        if model.n_outputs_ != 1:
+            raise TypeError('Only single-output forests can be exported.')
+        trees = [_sklearn_tree(estimator.tree_) for estimator in model.estimators_]
+        # Trees compare float32 features, as sklearn's tree code does.
+        super().__init__(trees, features, np.float32)
+
+    def predict_proba(
+        self, features: _FeatureMap, columns: dict[str, np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        leaves = self.leaves(features, columns, n_rows)
+        probabilities = np.zeros((n_rows, self.leaf_values.shape[1]))
+        # Summed tree by tree, in the same order as predict_proba.
+        for tree_index in range(self.n_trees):
+            probabilities += self.leaf_values[leaves[:, tree_index]]
+        probabilities /= self.n_trees
+        return probabilities
+
+
+class _BoostingModel(_TreeModel):
+    def __init__(
+        self, model: HistGradientBoostingClassifier, features: _FeatureMap
+    ) -> None:
+        if model.n_trees_per_iteration_ != 1:
+            raise TypeError('Only binary gradient boosting models can be exported.')
+        is_categorical = getattr(model, 'is_categorical_', None)
+        if getattr(model, '_preprocessor', None) is not None or (
+            is_categorical is not None and is_categorical.any()
+        ):
+            raise TypeError(
+                'Gradient boosting models with categorical features cannot be exported.'
+            )
+        trees = []
+        for (predictor,) in model._predictors:
+            nodes = predictor.nodes
+            trees.append(
+                {
+                    'features': nodes['feature_idx'],
+                    'thresholds': nodes['num_threshold'],
+                    'lefts': nodes['left'].astype(np.intp),
+                    'rights': nodes['right'].astype(np.intp),
+                    'missing_go_to_left': nodes['missing_go_to_left'],
+                    'is_leaf': nodes['is_leaf'].astype(bool),
+                    'values': nodes['value'],
+                }
+            )
+        self.baseline = model._baseline_prediction[0, 0]
+        super().__init__(trees, features, np.float64)
+
+    def predict_proba(
+        self, features: _FeatureMap, columns: dict[str, np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        leaves = self.leaves(features, columns, n_rows)
+        raw = np.full(n_rows, self.baseline)
+        for tree_index in range(self.n_trees):
+            raw += self.leaf_values[leaves[:, tree_index]]
+        probability = expit(raw)
+        return np.column_stack([1 - probability, probability])
+
+
+class _ConstantModel:
+    def __init__(self, model: DummyClassifier) -> None:
+        if model.strategy == 'prior':
+            self.probabilities = model.class_prior_
+        elif model.strategy == 'most_frequent':
+            self.probabilities = np.eye(len(model.classes_))[
+                model.class_prior_.argmax()
+            ]
+        else:
+            raise TypeError(
+                f'Cannot export DummyClassifier(strategy={model.strategy}).'
+            )
+
+    def predict_proba(
+        self, features: _FeatureMap, columns: dict[str, np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        return np.tile(self.probabilities, (n_rows, 1))
+
+
+# Binary SVC: the decision function is the kernel between each row and the
+# support vectors, weighted by the dual coefficients. Rows are scored in
+# blocks that keep the kernel matrix under max_cells values.
+class _KernelModel:
+    max_cells = 2**22
+
+    def __init__(self, model: SVC, features: _FeatureMap) -> None:
+        if len(model.classes_) != 2:
+            raise TypeError('Only binary SVC models can be exported.')
+        if model.kernel not in ('linear', 'poly', 'rbf', 'sigmoid'):
+            raise TypeError(f'Cannot export SVC(kernel={model.kernel!r}).')
+        support_vectors, dual_coef = model.support_vectors_, model.dual_coef_
+        if sparse.issparse(support_vectors):
+            support_vectors, dual_coef = support_vectors.toarray(), dual_coef.toarray()
+        self.support_vectors = np.asarray(support_vectors, dtype=np.float64)
+        self.dual_coef = np.asarray(dual_coef[0], dtype=np.float64)
+        self.intercept = model.intercept_[0]
+        self.kernel = model.kernel
+        self.gamma = model._gamma
+        self.coef0 = model.coef0
+        self.degree = model.degree
+        if model._probA.size:
+            self.prob_a = model._probA[0]
+            self.prob_b = model._probB[0]
+
+    def _kernel(self, X: np.ndarray) -> np.ndarray:
+        dot = X @ self.support_vectors.T
+        if self.kernel == 'linear':
+            return dot
+        if self.kernel == 'poly':
+            return (self.gamma * dot + self.coef0) ** self.degree
+        if self.kernel == 'sigmoid':
+            return np.tanh(self.gamma * dot + self.coef0)
+        squared_distances = (
+            np.einsum('ij,ij->i', X, X)[:, np.newaxis]
+            - 2 * dot
+            + np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+        )
+        return np.exp(-self.gamma * np.maximum(squared_distances, 0))
+
+    def decision_function(
+        self, features: _FeatureMap, columns: dict[str, np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        block_size = max(self.max_cells // len(self.support_vectors), 1)
+        return (
+            np.concatenate(
+                [
+                    self._kernel(features.dense(block_columns, n_block))
+                    @ self.dual_coef
+                    for block_columns, n_block in _row_blocks(
+                        columns, n_rows, block_size
+                    )
+                ]
+                + [np.empty(0)]
+            )
+            + self.intercept
+        )
+
+    def _has_probabilities(self) -> bool:
+        return 'prob_a' in vars(self)
+
+    @available_if(_has_probabilities)
+    def predict_proba(
+        self, features: _FeatureMap, columns: dict[str, np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        # libsvm's Platt scaling, on its own sign of the decision function and
+        # with the same clipping of the probabilities.
+        decision = self.decision_function(features, columns, n_rows)
+        pairwise = np.clip(expit(decision * self.prob_a - self.prob_b), 1e-7, 1 - 1e-7)
+        return _couple_pairwise(pairwise)
+
+
+def _couple_pairwise(pairwise: np.ndarray) -> np.ndarray:
+    # libsvm's multiclass_probability for two classes, vectorized over rows:
+    # the same fixed-point iterations and per-row stopping rule, so the
+    # probabilities match predict_proba rather than the exact solution.
+    Q = np.empty((len(pairwise), 2, 2))
+    Q[:, 0, 0] = (1 - pairwise) ** 2
+    Q[:, 1, 1] = pairwise**2
+    Q[:, 0, 1] = Q[:, 1, 0] = -(1 - pairwise) * pairwise
+    p = np.full((len(pairwise), 2), 0.5)
+    active = np.ones(len(pairwise), dtype=bool)
+    for _ in range(100):
+        Qp = np.einsum('nij,nj->ni', Q, p)
+        pQp = np.einsum('ni,ni->n', p, Qp)
+        active &= np.abs(Qp - pQp[:, np.newaxis]).max(axis=1) >= 0.005 / 2
+        if not active.any():
+            break
+        for t in range(2):
+            diff = np.where(active, (pQp - Qp[:, t]) / Q[:, t, t], 0.0)
+            p[:, t] += diff
+            pQp = (pQp + diff * (diff * Q[:, t, t] + 2 * Qp[:, t])) / (1 + diff) ** 2
+            Qp = (Qp + diff[:, np.newaxis] * Q[:, t]) / (1 + diff[:, np.newaxis])
+            p /= 1 + diff[:, np.newaxis]
+    return p
+
+
+# A linear SVM on a Nystroem feature map, optionally after a StandardScaler.
+# The map is the kernel between each row and the components, times the
+# normalization matrix, so the normalization folds into the linear
+# coefficients and scoring is an SVC whose support vectors are the components.
+class _NystroemModel(_KernelModel):
+    def __init__(
+        self,
+        scalers: list,
+        kernel_map: Nystroem,
+        model: LinearSVC,
+        features: _FeatureMap,
+    ) -> None:
+        if len(scalers) > 1 or not all(
+            isinstance(scaler, StandardScaler) for scaler in scalers
+        ):
+            raise TypeError('Only a StandardScaler can come before a Nystroem map.')
+        if not isinstance(model, LinearSVC) or model.coef_.shape[0] != 1:
+            raise TypeError(
+                'Only binary LinearSVC models on a Nystroem map can be exported.'
+            )
+        if kernel_map.kernel not in ('linear', 'poly', 'rbf', 'sigmoid') or (
+            kernel_map.kernel_params
+        ):
+            raise TypeError(f'Cannot export Nystroem(kernel={kernel_map.kernel!r}).')
+        n_inputs = features.n_features_out
+        self.mean, self.scale = np.zeros(n_inputs), np.ones(n_inputs)
+        for scaler in scalers:
+            if scaler.mean_ is not None:
+                self.mean = scaler.mean_
+            if scaler.scale_ is not None:
+                self.scale = scaler.scale_
+        self.support_vectors = np.asarray(kernel_map.components_, dtype=np.float64)
+        self.dual_coef = kernel_map.normalization_.T @ model.coef_[0]
+        self.intercept = model.intercept_[0]
+        # pairwise_kernels' defaults for the parameters Nystroem leaves unset.
+        self.kernel = kernel_map.kernel
+        self.gamma = 1 / n_inputs if kernel_map.gamma is None else kernel_map.gamma
+        self.coef0 = 1 if kernel_map.coef0 is None else kernel_map.coef0
+        self.degree = 3 if kernel_map.degree is None else kernel_map.degree
+
+    def _kernel(self, X: np.ndarray) -> np.ndarray:
+        return super()._kernel((X - self.mean) / self.scale)
+
+
+def _model_has(method: str):
+    return lambda predictor: hasattr(predictor.model, method)
+
+
+class CompiledPredictor:
+    def __init__(self, pipeline: Pipeline) -> None:
+        steps = [step for _, step in pipeline.steps]
+        middle = steps[1:-1]
+        if not isinstance(steps[0], ColumnTransformer) or not (
+            not middle
+            or len(middle) == 1
+            and isinstance(middle[0], (PolynomialFeatures, SparseInteractions))
+            or isinstance(middle[-1], Nystroem)
+        ):
+            raise TypeError(
+                'Only pipelines of a ColumnTransformer, optionally polynomial '
+                'features or a Nystroem map, and the estimator can be exported.'
+            )
+        self.features = _FeatureMap(steps[0])
+        self.feature_names_in_ = steps[0].feature_names_in_
+        estimator = steps[-1]
+        self.classes_ = estimator.classes_
+
+        if middle and isinstance(middle[-1], Nystroem):
+            self.model = _NystroemModel(
+                middle[:-1], middle[-1], estimator, self.features
+            )
+        elif middle:
+            if not isinstance(estimator, LogisticRegression):
+                raise TypeError(
+                    'Only logistic regressions on polynomial features can be exported.'
+                )
+            self.model = _PolynomialModel(middle[0], estimator, self.features)
+        elif isinstance(estimator, LogisticRegression):
+            self.model = _LinearModel(estimator, self.features)
+        elif isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier)):
+            self.model = _ForestModel(estimator, self.features)
+        elif isinstance(estimator, HistGradientBoostingClassifier):
+            self.model = _BoostingModel(estimator, self.features)
+        elif isinstance(estimator, DummyClassifier):
+            self.model = _ConstantModel(estimator)
+        elif isinstance(estimator, SVC):
+            self.model = _KernelModel(estimator, self.features)
+        else:
+            raise TypeError(f'Cannot export {type(estimator).__name__} models.')
+
+    def _score(self, method: str, X, chunk_size: int) -> list[np.ndarray]:
+        # Rows are scored in chunks, so no intermediate array grows with the
+        # size of X.
+        score = getattr(self.model, method)
+        columns = self.features.input_columns(X)
+        return [
+            score(self.features, chunk_columns, n_chunk)
+            for chunk_columns, n_chunk in _row_blocks(columns, len(X), chunk_size)
+        ]
+
+    @available_if(_model_has('predict_proba'))
+    def predict_proba(self, X, chunk_size: int = 65_536) -> np.ndarray:
+        chunks = self._score('predict_proba', X, chunk_size)
+        return np.concatenate(chunks + [np.empty((0, len(self.classes_)))])
+
+    @available_if(_model_has('decision_function'))
+    def decision_function(self, X, chunk_size: int = 65_536) -> np.ndarray:
+        return np.concatenate(
+            self._score('decision_function', X, chunk_size) + [np.empty(0)]
+        )
+
+    def predict(self, X, chunk_size: int = 65_536) -> np.ndarray:
+        # SVC predicts from the sign of its decision function even when it
+        # has probabilities.
+        if hasattr(self.model, 'decision_function'):
+            positive = self.decision_function(X, chunk_size) > 0
+            return self.classes_[positive.astype(np.intp)]
+        return self.classes_[self.predict_proba(X, chunk_size).argmax(axis=1)]
+
+
+def export_predictor(pipeline: Pipeline) -> CompiledPredictor:
+    return CompiledPredictor(pipeline)
@@ -0,0 +1,155 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV, ParameterGrid
+
+from .config import DATA_FOLDER, PROCESSED_DATASET_FOLDER, RANDOM_SEED, SEARCH_FOLDER
+from .parallel import fit_with_budget
+
+SCORING = 'f1'
+
+
+def _search_folder(base_path: Path) -> Path:
+    return base_path / DATA_FOLDER / PROCESSED_DATASET_FOLDER / SEARCH_FOLDER
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, BaseEstimator):
+        return repr(value)
+    return value
+
+
+def _halving_resources(
+    param_grid: dict, resource: str, n_rows: int
+) -> tuple[dict, int, int]:
+    # A grid parameter used as the resource leaves the grid and its largest
+    # value becomes the final budget. Also returns the total budget spent by
+    # the exhaustive search over the original grid.
+    if resource in param_grid:
+        halving_grid = dict(param_grid)
+        budgets = halving_grid.pop(resource)
+        return (
+            halving_grid,
+            max(budgets),
+            sum(budgets) * len(ParameterGrid(halving_grid)),
+        )
+    if resource == 'n_samples':
+        return param_grid, n_rows, n_rows * len(ParameterGrid(param_grid))
+    raise ValueError(
+        f'resource must be n_samples or one of the grid parameters, got {resource}.'
+    )
+
+
+def _estimated_exhaustive_seconds(
+    search: HalvingGridSearchCV, exhaustive_resources: int
+) -> float:
+    # Fit plus score time per unit of resource in the last round, which runs on
+    # the full budget, assuming the cost grows linearly with the resource.
+    results = pd.DataFrame(search.cv_results_)
+    last_round = results[results['iter'] == results['iter'].max()]
+    seconds_per_split = (
+        last_round['mean_fit_time'] + last_round['mean_score_time']
+    ).mean()
+    seconds_per_resource = seconds_per_split / search.n_resources_[-1]
+    return seconds_per_resource * exhaustive_resources * search.n_splits_
+
+
+def save_search_results(
+    search: HalvingGridSearchCV, summary: dict, base_path: Path, search_name: str
+) -> Path:
+    search_folder = _search_folder(base_path)
+    search_folder.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(search.cv_results_).to_csv(
+        search_folder / f'{search_name}_cv_results.csv', index=False
+    )
+    summary_path = search_folder / f'{search_name}.json'
+    summary_path.write_text(json.dumps(summary, indent=4, default=_json_value))
+    return summary_path
+
+
+def load_search_summary(base_path: Path, search_name: str) -> dict:
+    summary_path = _search_folder(base_path) / f'{search_name}.json'
+    return json.loads(summary_path.read_text())
+
+
+def run_halving_search(
+    estimator: BaseEstimator,
+    param_grid: dict,
+    X: pd.DataFrame,
+    y: pd.Series,
+    base_path: Path,
+    search_name: str,
+    resource: str = 'n_samples',
+    factor: int = 3,
+    cv=5,
+    n_jobs: int = 1,
+    run_baseline: bool = False,
+    verbose: int = 0,
+) -> HalvingGridSearchCV:
+    halving_grid, max_resources, exhaustive_resources = _halving_resources(
+        param_grid, resource, len(X)
+    )
+    n_candidates = len(ParameterGrid(param_grid))
+
+    search = HalvingGridSearchCV(
+        estimator,
+        halving_grid,
+        factor=factor,
+        resource=resource,
+        # The first budget is chosen so the last round runs on the full one.
+        min_resources='exhaust',
+        max_resources=max_resources,
+        cv=cv,
+        scoring=SCORING,
+        refit=True,
+        random_state=RANDOM_SEED,
+        verbose=verbose,
+    )
+    # n_jobs is the core budget, split between the search workers and the
+    # threads of each fit.
+    start = time.perf_counter()
+    fit_with_budget(search, X, y, n_jobs)
+    halving_seconds = time.perf_counter() - start
+
+    if run_baseline:
+        baseline = GridSearchCV(clone(estimator), param_grid, cv=cv, scoring=SCORING)
+        start = time.perf_counter()
+        fit_with_budget(baseline, X, y, n_jobs)
+        baseline_seconds = time.perf_counter() - start
+        baseline_score = baseline.best_score_
+    else:
+        baseline_seconds = _estimated_exhaustive_seconds(search, exhaustive_resources)
+        baseline_score = None
+
+    summary = {
+        'resource': resource,
+        'factor': factor,
+        'n_candidates': n_candidates,
+        'n_iterations': search.n_iterations_,
+        'n_resources': search.n_resources_,
+        'n_candidates_per_iteration': search.n_candidates_,
+        'best_params': search.best_params_,
+        'best_score': search.best_score_,
+        'halving_seconds': halving_seconds,
+        'baseline_seconds': baseline_seconds,
+        'baseline_estimated': not run_baseline,
+        'baseline_best_score': baseline_score,
+        'seconds_saved': baseline_seconds - halving_seconds,
+    }
+    save_search_results(search, summary, base_path, search_name)
+
+    baseline_label = 'estimated' if not run_baseline else 'measured'
+    print(
+        f'{search_name}: {n_candidates} candidates in {halving_seconds:.1f} s '
+        f'(exhaustive, {baseline_label}: {baseline_seconds:.1f} s, '
+        f'{baseline_seconds - halving_seconds:.1f} s saved), '
+        f'best {SCORING} = {search.best_score_:.4f}'
+    )
+    return search
@@ -0,0 +1,291 @@
+import argparse
+import asyncio
+import pickle
+import time
+from pathlib import Path
+from typing import Self
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator
+
+from .dataset import load_cached_datasets, load_schema
+from .model_store import load_model as load_stored_model
+
+
+def load_model(model_path: Path) -> BaseEstimator:
+    # Model stores are folders; anything else is a pickled pipeline.
+    if model_path.is_dir():
+        return load_stored_model(model_path)
+    with open(model_path, 'rb') as model_file:
+        return pickle.load(model_file)
+
+
+def _request_dtype(
+    dtype: pd.CategoricalDtype | np.dtype,
+) -> pd.CategoricalDtype | np.dtype:
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        return np.dtype(np.float64)
+    return dtype
+
+
+class PredictionService:
+    def __init__(
+        self,
+        model: BaseEstimator,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+    ) -> None:
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.feature_names = list(model.feature_names_in_)
+        # Same categories as training: unknown ones such as '?' become NaN and
+        # are imputed like the missing values the model was fit on. Numbers are
+        # floats whatever the schema says, so a missing or fractional value
+        # reaches the imputer instead of failing or being truncated.
+        schema = load_schema()
+        self.dtypes = {
+            col: _request_dtype(schema.get(col, np.dtype(object)))
+            for col in self.feature_names
+        }
+        self.category_codes = {
+            col: {category: code for code, category in enumerate(dtype.categories)}
+            for col, dtype in self.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        }
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._batch: list[tuple[list, asyncio.Future]] = []
+
+    def _as_record(self, record) -> dict:
+        if isinstance(record, dict):
+            return record
+        return dict(zip(self.feature_names, record))
+
+    def records_to_frame(self, records) -> pd.DataFrame:
+        if isinstance(records, dict):
+            records = [records]
+        records = [self._as_record(record) for record in records]
+
+        # Categoricals are built from precomputed codes, which skips the
+        # category validation that dominates the cost of astype on small batches.
+        columns = {}
+        for col in self.feature_names:
+            values = [record[col] for record in records]
+            if col in self.category_codes:
+                codes = self.category_codes[col]
+                columns[col] = pd.Categorical.from_codes(
+                    np.array([codes.get(value, -1) for value in values]),
+                    dtype=self.dtypes[col],
+                    validate=False,
+                )
+            else:
+                columns[col] = np.array(values, dtype=self.dtypes[col])
+        return pd.DataFrame(columns, copy=False)
+
+    def predict_batch(self, records) -> dict:
+        frame = self.records_to_frame(records)
+        # Predictions come from predict rather than the most probable class,
+        # since the two can disagree for models that decide on the sign of
+        # decision_function, such as SVC.
+        probabilities = None
+        if hasattr(self.model, 'predict_proba'):
+            probabilities = self.model.predict_proba(frame)
+        return {'prediction': self.model.predict(frame), 'probability': probabilities}
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._serve())
+
+    async def stop(self) -> None:
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        # Requests still queued, or in the batch the worker was serving, are
+        # cancelled instead of being left to wait forever.
+        pending = [future for _, future in self._batch]
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait()[1])
+        for future in pending:
+            future.cancel()
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _next_batch(self) -> list[tuple[list, asyncio.Future]]:
+        # Waits for one request, then gathers whatever else arrives within
+        # max_wait, up to max_batch_size records.
+        batch = self._batch = [await self._queue.get()]
+        n_records = len(batch[0][0])
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while n_records < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self._queue.get(), timeout)
+            except TimeoutError:
+                break
+            batch.append(request)
+            n_records += len(request[0])
+        return batch
+
+    async def _serve(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            records = [
+                record for request_records, _ in batch for record in request_records
+            ]
+            try:
+                # Runs off the event loop so the next batch fills meanwhile.
+                result = await asyncio.to_thread(self.predict_batch, records)
+            except Exception as error:  # noqa: BLE001
+                # Any error goes to the requests instead of stopping the worker.
+                if len(batch) == 1:
+                    _, future = batch[0]
+                    if not future.done():
+                        future.set_exception(error)
+                else:
+                    await self._serve_separately(batch)
+                continue
+
+            start = 0
+            for request_records, future in batch:
+                stop = start + len(request_records)
+                if not future.done():
+                    future.set_result(
+                        {
+                            name: None if values is None else values[start:stop]
+                            for name, values in result.items()
+                        }
+                    )
+                start = stop
+
+    async def _serve_separately(self, batch: list[tuple[list, asyncio.Future]]) -> None:
+        # A bad record fails the whole batch, so its requests are retried one
+        # by one and only the ones that fail on their own get the error.
+        for request_records, future in batch:
+            try:
+                result = await asyncio.to_thread(self.predict_batch, request_records)
+            except Exception as error:  # noqa: BLE001
+                # The error belongs to this request alone; the others still run.
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def predict(self, records) -> dict:
+        if self._worker is None or self._worker.done():
+            raise RuntimeError('The prediction service is not running.')
+        if len(records) == 0:
+            raise ValueError('No records to predict.')
+        single = isinstance(records, dict) or not isinstance(
+            records[0], (dict, list, tuple, np.ndarray)
+        )
+        request_records = [records] if single else list(records)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request_records, future))
+        result = await future
+        if single:
+            return {
+                name: None if values is None else values[0]
+                for name, values in result.items()
+            }
+        return result
+
+
+async def run_load_test(
+    service: PredictionService,
+    records: list[dict],
+    n_requests: int = 2000,
+    concurrency: int = 32,
+) -> dict:
+    latencies = []
+
+    async def client(client_index: int) -> None:
+        for request_index in range(client_index, n_requests, concurrency):
+            start = time.perf_counter()
+            await service.predict(records[request_index % len(records)])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return _latency_report(latencies, elapsed)
+
+
+def _latency_report(latencies: list[float], elapsed: float) -> dict:
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'p50_ms': np.percentile(latencies_ms, 50),
+        'p99_ms': np.percentile(latencies_ms, 99),
+        'throughput_rps': len(latencies) / elapsed,
+    }
+
+
+def run_unbatched_baseline(
+    model: BaseEstimator, records: list[dict], n_requests: int
+) -> dict:
+    # One DataFrame and one predict_proba per request, as in the notebook.
+    latencies = []
+    start = time.perf_counter()
+    for request_index in range(n_requests):
+        request_start = time.perf_counter()
+        frame = pd.DataFrame([records[request_index % len(records)]])
+        model.predict_proba(frame)
+        latencies.append(time.perf_counter() - request_start)
+    return _latency_report(latencies, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Load-test the micro-batching prediction service.'
+    )
+    parser.add_argument('model_path', type=Path)
+    parser.add_argument('--base-path', type=Path, default=Path.cwd())
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--baseline-requests', type=int, default=200)
+    args = parser.parse_args()
+
+    model = load_model(args.model_path)
+    X_test = load_cached_datasets(args.base_path).X_test
+    records = (
+        X_test[list(model.feature_names_in_)].astype(object).to_dict(orient='records')
+    )
+
+    service = PredictionService(model, args.max_batch_size, args.max_wait_ms)
+
+    async def load_test() -> dict:
+        async with service:
+            return await run_load_test(
+                service, records, args.requests, args.concurrency
+            )
+
+    reports = {'micro-batched': asyncio.run(load_test())}
+    if args.baseline_requests:
+        reports['one-row predict'] = run_unbatched_baseline(
+            model, records, args.baseline_requests
+        )
+
+    print(f'{"mode":<18}{"requests":>10}{"p50 (ms)":>10}{"p99 (ms)":>10}{"req/s":>10}')
+    for mode, report in reports.items():
+        print(
+            f'{mode:<18}{report["requests"]:>10}{report["p50_ms"]:>10.2f}'
+            f'{report["p99_ms"]:>10.2f}{report["throughput_rps"]:>10.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
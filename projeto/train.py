@@ -0,0 +1,363 @@
+import argparse
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Memory, Parallel, delayed
+from sklearn.base import BaseEstimator, clone
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC, LinearSVC
+
+from .config import DATA_FOLDER, PROCESSED_DATASET_FOLDER, RANDOM_SEED, TRAINING_FOLDER
+from .dataset import load_cached_datasets
+from .features import (
+    SparseInteractions,
+    build_pipeline,
+    build_preprocessor,
+    feature_memory,
+)
+from .model_store import save_model
+from .parallel import apply_plan, fit_with_budget, plan_parallelism, thread_limits
+
+SCORING = 'f1'
+POSITIVE_CLASS = '>50K'
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    build_estimator: Callable[[Memory | None], BaseEstimator]
+    param_grid: dict = field(default_factory=dict)
+    n_splits: int | None = None
+    n_train_rows: int | None = None
+
+
+def _build_dummy(memory: Memory | None) -> BaseEstimator:
+    return build_pipeline(
+        [('dummy', DummyClassifier(strategy='most_frequent'))], memory
+    )
+
+
+def _build_log1(memory: Memory | None) -> BaseEstimator:
+    log_reg1 = LogisticRegression(
+        penalty='l2', max_iter=3700, solver='lbfgs', random_state=RANDOM_SEED
+    )
+    return build_pipeline([('log_reg1', log_reg1)], memory)
+
+
+def _build_log2(memory: Memory | None) -> BaseEstimator:
+    # Sparse interactions instead of the dense PolynomialFeatures step.
+    log_reg2 = LogisticRegression(
+        penalty='l2', max_iter=700, solver='lbfgs', random_state=RANDOM_SEED
+    )
+    return build_pipeline(
+        [('poly', SparseInteractions()), ('log_reg2', log_reg2)],
+        memory,
+        build_preprocessor(sparse=True),
+    )
+
+
+def _build_svm(memory: Memory | None) -> BaseEstimator:
+    sup_ver_mach = SVC(random_state=RANDOM_SEED, class_weight='balanced')
+    return build_pipeline([('sup_ver_mach', sup_ver_mach)], memory)
+
+
+def _build_svm_approx(memory: Memory | None) -> BaseEstimator:
+    # The polynomial kernel of the SVC, approximated by an explicit feature map
+    # so a linear SVM can train on every row and predict without support
+    # vectors. The passthrough capital columns are scaled first, otherwise
+    # they swamp the kernel.
+    kernel = Nystroem(
+        kernel='poly', coef0=0, n_components=300, random_state=RANDOM_SEED
+    )
+    linear_svm = LinearSVC(class_weight='balanced', random_state=RANDOM_SEED)
+    return build_pipeline(
+        [('scaler', StandardScaler()), ('kernel', kernel), ('linear_svm', linear_svm)],
+        memory,
+    )
+
+
+def _build_random_forest(memory: Memory | None) -> BaseEstimator:
+    rand_forest = RandomForestClassifier(n_jobs=-1, random_state=RANDOM_SEED)
+    return build_pipeline([('rand_forest', rand_forest)], memory)
+
+
+def _build_hist_grad(memory: Memory | None) -> BaseEstimator:
+    hist_grad = HistGradientBoostingClassifier(random_state=RANDOM_SEED)
+    return build_pipeline([('hist_grad', hist_grad)], memory)
+
+
+MODEL_SPECS = {
+    'dummy': ModelSpec(_build_dummy),
+    'log1': ModelSpec(
+        _build_log1, {'log_reg1__C': np.logspace(-3, 3, 7).tolist()}, n_splits=4
+    ),
+    'log2': ModelSpec(
+        _build_log2,
+        {'log_reg2__C': np.logspace(-3, 3, 7).tolist(), 'poly__degree': [2, 3]},
+        n_splits=2,
+    ),
+    'svm': ModelSpec(
+        _build_svm,
+        {
+            'sup_ver_mach__C': np.logspace(-3, 3, 7).tolist(),
+            'sup_ver_mach__kernel': ['poly'],
+            'sup_ver_mach__degree': [2, 3, 4],
+        },
+        n_splits=2,
+        n_train_rows=3000,
+    ),
+    'svm_approx': ModelSpec(
+        _build_svm_approx,
+        {
+            'linear_svm__C': np.logspace(-3, 3, 7).tolist(),
+            'kernel__degree': [2, 3, 4],
+        },
+        n_splits=2,
+    ),
+    'random_forest': ModelSpec(
+        _build_random_forest,
+        {
+            'rand_forest__n_estimators': [2, 8, 32, 128, 512],
+            'rand_forest__max_depth': [1, 4, 16, 64, None],
+            'rand_forest__max_features': [0.1, 0.3, 0.5, 0.7, 1.0],
+        },
+        n_splits=3,
+    ),
+    'hist_grad': ModelSpec(
+        _build_hist_grad,
+        {
+            'hist_grad__max_depth': [1, 4, 16, 64],
+            'hist_grad__max_features': [0.1, 0.3, 0.5, 0.7, 1.0],
+        },
+        n_splits=5,
+    ),
+}
+
+
+def _training_folder(base_path: Path) -> Path:
+    return base_path / DATA_FOLDER / PROCESSED_DATASET_FOLDER / TRAINING_FOLDER
+
+
+def _write_atomic(file_path: Path, content: bytes) -> None:
+    # A checkpoint is either absent or complete, even if the run is killed
+    # while it is being written.
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f'.{file_path.name}.'
+    )
+    with os.fdopen(file_descriptor, 'wb') as temp_file:
+        temp_file.write(content)
+    os.replace(temp_path, file_path)
+
+
+def _training_rows(
+    X: pd.DataFrame, y: pd.Series, n_train_rows: int | None
+) -> tuple[pd.DataFrame, pd.Series]:
+    if n_train_rows is None:
+        return X, y
+    # Same draw as the notebook's np.random.seed(42) subset.
+    subset_index = np.random.RandomState(RANDOM_SEED).choice(
+        X.index, size=n_train_rows, replace=False
+    )
+    return X.loc[subset_index], y.loc[subset_index]
+
+
+def _spec_fingerprint(spec: ModelSpec, X: pd.DataFrame, y: pd.Series) -> str:
+    # Checkpoints are only reused for the same grid, folds and training rows.
+    return joblib.hash(
+        (
+            sorted(spec.param_grid.items()),
+            spec.n_splits,
+            spec.n_train_rows,
+            spec.build_estimator(None),
+            X,
+            y,
+        )
+    )[:16]
+
+
+def _prepare_model_folder(model_folder: Path, fingerprint: str, restart: bool) -> None:
+    fingerprint_path = model_folder / 'fingerprint.txt'
+    if restart:
+        shutil.rmtree(model_folder, ignore_errors=True)
+    elif fingerprint_path.exists() and fingerprint_path.read_text() != fingerprint:
+        raise ValueError(
+            f'The checkpoints in {model_folder} were made for a different model '
+            'spec or training data. Run with restart to discard them.'
+        )
+    (model_folder / 'folds').mkdir(parents=True, exist_ok=True)
+    fingerprint_path.write_text(fingerprint)
+
+
+def _fit_fold(
+    estimator: BaseEstimator,
+    params: dict,
+    X: pd.DataFrame,
+    y: pd.Series,
+    train_positions: np.ndarray,
+    test_positions: np.ndarray,
+    checkpoint_path: Path,
+) -> dict:
+    estimator = clone(estimator).set_params(**params)
+    start = time.perf_counter()
+    estimator.fit(X.iloc[train_positions], y.iloc[train_positions])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    test_score = get_scorer(SCORING)(
+        estimator, X.iloc[test_positions], y.iloc[test_positions]
+    )
+    score_time = time.perf_counter() - start
+
+    result = {
+        'params': params,
+        'test_score': test_score,
+        'fit_time': fit_time,
+        'score_time': score_time,
+    }
+    _write_atomic(checkpoint_path, json.dumps(result, indent=4).encode())
+    return result
+
+
+def _cv_results(fold_results: dict, n_candidates: int, n_splits: int) -> pd.DataFrame:
+    rows = []
+    for candidate in range(n_candidates):
+        results = [fold_results[candidate, fold] for fold in range(n_splits)]
+        scores = [result['test_score'] for result in results]
+        rows.append(
+            {
+                'params': results[0]['params'],
+                'mean_test_score': np.mean(scores),
+                'std_test_score': np.std(scores),
+                'mean_fit_time': np.mean([result['fit_time'] for result in results]),
+            }
+        )
+    cv_results = pd.DataFrame(rows)
+    cv_results['rank_test_score'] = (
+        cv_results['mean_test_score'].rank(ascending=False, method='min').astype(int)
+    )
+    return cv_results
+
+
+def train_model(
+    name: str,
+    X: pd.DataFrame,
+    y: pd.Series,
+    base_path: Path,
+    n_cores: int = -1,
+    restart: bool = False,
+) -> BaseEstimator:
+    spec = MODEL_SPECS[name]
+    X, y = _training_rows(X, y, spec.n_train_rows)
+    model_folder = _training_folder(base_path) / name
+    _prepare_model_folder(model_folder, _spec_fingerprint(spec, X, y), restart)
+
+    model_path = model_folder / 'model.pickle'
+    if model_path.exists():
+        print(f'{name}: already trained, loading {model_path}')
+        with open(model_path, 'rb') as model_file:
+            return pickle.load(model_file)
+
+    estimator = spec.build_estimator(feature_memory(base_path))
+    candidates = list(ParameterGrid(spec.param_grid))
+    best_params = candidates[0]
+    metrics = {}
+
+    if spec.n_splits is not None:
+        folds = list(StratifiedKFold(n_splits=spec.n_splits).split(np.zeros(len(y)), y))
+        fold_results, pending = {}, []
+        for candidate, params in enumerate(candidates):
+            for fold, (train_positions, test_positions) in enumerate(folds):
+                checkpoint_path = model_folder / 'folds' / f'{candidate}_{fold}.json'
+                if checkpoint_path.exists():
+                    fold_results[candidate, fold] = json.loads(
+                        checkpoint_path.read_text()
+                    )
+                    continue
+                pending.append(
+                    (
+                        (candidate, fold),
+                        (params, train_positions, test_positions, checkpoint_path),
+                    )
+                )
+
+        print(
+            f'{name}: {len(candidates)} candidates x {len(folds)} folds, '
+            f'{len(fold_results)} restored from checkpoints, {len(pending)} to run'
+        )
+        if pending:
+            plan = plan_parallelism(n_cores, len(pending))
+            apply_plan(estimator, plan)
+            with thread_limits(plan):
+                results = Parallel(n_jobs=plan.search_n_jobs, verbose=10)(
+                    delayed(_fit_fold)(estimator, params, X, y, *task)
+                    for _, (params, *task) in pending
+                )
+            fold_results.update(zip([key for key, _ in pending], results))
+
+        cv_results = _cv_results(fold_results, len(candidates), len(folds))
+        cv_results.to_csv(model_folder / 'cv_results.csv', index=False)
+        best = cv_results.loc[cv_results['rank_test_score'].idxmin()]
+        best_params = best['params']
+        metrics[f'cv_{SCORING}'] = best['mean_test_score']
+        print(
+            f'{name}: best {SCORING} = {best["mean_test_score"]:.4f} with {best_params}'
+        )
+
+    # The refit has the whole budget to itself.
+    final_estimator = fit_with_budget(
+        clone(estimator).set_params(**best_params), X, y, n_cores
+    )
+    _write_atomic(model_path, pickle.dumps(final_estimator))
+    try:
+        save_model(final_estimator, model_folder / 'store', metrics)
+    except TypeError as error:
+        print(f'{name}: no model store, {error}')
+    return final_estimator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Train the model specs with checkpointed, resumable searches.'
+    )
+    parser.add_argument('--base-path', type=Path, default=Path.cwd())
+    parser.add_argument(
+        '--models', nargs='*', choices=list(MODEL_SPECS), default=list(MODEL_SPECS)
+    )
+    parser.add_argument('--n-cores', type=int, default=-1)
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Discard the checkpoints of the selected models and start over.',
+    )
+    args = parser.parse_args()
+
+    datasets = load_cached_datasets(args.base_path)
+    y_train = (datasets.y_train == POSITIVE_CLASS).astype(int)
+    for name in args.models:
+        train_model(
+            name,
+            datasets.X_train,
+            y_train,
+            args.base_path,
+            n_cores=args.n_cores,
+            restart=args.restart,
+        )
+
+
+if __name__ == '__main__':
+    main()